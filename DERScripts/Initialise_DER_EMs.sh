@@ -1,3 +1,5 @@
+# The DER-EMs are about to change, so the ME's cached model metadata is out of date.
+rm -rf ../ModelMetadata_Cache
 bash ./drop_orig_der.sh
 bash ./drop_der.sh
 bash ./insert_der.sh
@@ -1 +1,3 @@
+# The model's measurements are about to change, so the ME's cached model metadata is out of date.
+rm -rf ../ModelMetadata_Cache
 python3 DropMeasurements.py cimhubconfig.json _7CC7F9FC-9838-4908-8E45-931913DAFBA4
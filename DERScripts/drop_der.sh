@@ -1,3 +1,5 @@
+# The model's DER-EMs are about to change, so the ME's cached model metadata is out of date.
+rm -rf ../ModelMetadata_Cache
 source envars.sh
 
 #python3 $CIMHUB_UTILS/DropDER.py ../cimhubconfig.json acep_psil_der_uuid.txt
@@ -1,3 +1,5 @@
+# The DER-EMs are about to change, so the ME's cached model metadata is out of date.
+rm -rf ../ModelMetadata_Cache
 #echo "\n\n----> inserting Houses <----\n\n"
 #bash ./insert_houses.sh
 echo "\n\n----> inserting DERs <----\n\n"
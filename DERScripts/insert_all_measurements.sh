@@ -1,3 +1,5 @@
+# The model's measurements are about to change, so the ME's cached model metadata is out of date.
+rm -rf ../ModelMetadata_Cache
 source envars.sh
 
 #python3 $CIMHUB_UTILS/InsertMeasurements.py cimhubconfig.json ./Meas/acep_psil_lines_pq.txt  ./Meas/acep_msid.json
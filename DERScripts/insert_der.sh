@@ -1 +1,3 @@
+# The model's DER-EMs are about to change, so the ME's cached model metadata is out of date.
+rm -rf ../ModelMetadata_Cache
 python3 InsertDER.py cimhubconfig.json EGoT13_der_psu.txt
\ No newline at end of file
@@ -1,3 +1,5 @@
+# The model's measurements are about to change, so the ME's cached model metadata is out of date.
+rm -rf ../ModelMetadata_Cache
 python3 InsertMeasurements.py cimhubconfig.json ./Meas/psu_13_node_feeder_lines_pq.txt ./Meas/psu_13_node_feeder.json
 python3 InsertMeasurements.py cimhubconfig.json ./Meas/psu_13_node_feeder_loads.txt    ./Meas/psu_13_node_feeder.json
 python3 InsertMeasurements.py cimhubconfig.json ./Meas/psu_13_node_feeder_node_v.txt   ./Meas/psu_13_node_feeder.json
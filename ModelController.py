@@ -12,7 +12,26 @@ import re
 import ast
 import csv
 import os
+import json
+import gzip
+import shutil
+import bisect
+import glob
+import hashlib
 import sys
+import heapq
+import inspect
+import traceback
+import queue
+import pickle
+import threading
+import struct
+import itertools
+import ctypes
+import ctypes.util
+import importlib
+import importlib.metadata
+import numpy as np
 import pandas as pd
 from gridappsd import GridAPPSD, DifferenceBuilder
 from gridappsd import topics as t
@@ -20,8 +39,12 @@ from gridappsd.simulation import Simulation
 import time
 import xml.etree.ElementTree as ET
 import xmltodict
+from xml.parsers.expat import ExpatError
 from dict2xml import dict2xml
-from datetime import datetime
+from datetime import datetime, timezone
+from types import MappingProxyType
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pprint import pprint as pp
 
 end_program = False
@@ -45,15 +68,92 @@ class MCConfiguration:
             .config_file_path: The text file containing the GridAPPS-D configuration info.
 
             .ders_obj_list: A dictionary containing the DER-S classes and objects *that will be used in the current
-                simulation*. Add or comment out as appropriate for new DER-Ss or for different tests.
+                simulation*. Add or comment out as appropriate for new DER-Ss or for different tests. The class is
+                either a built-in DER-S class, the name of a DER-S entry point (see DERSRegistry), or a
+                'module:ClassName' import path; the object name is the name the DER-S is registered under.
+
+            .load_der_s_entry_points: Set to True to also register every DER-S installed as an entry point (see
+                DERSRegistry), in addition to those in ders_obj_list.
 
             .go_sensor_decision_making_manual_override: Set to True to use manual GOSensor decision making (That is,
                 grid services are called by a text file rather than based on grid conditions.
                 NOTE: Automatic mode is not currently implemented, so this should ALWAYS be set to True.
 
+            .rwhders_use_file_watcher: Set to True for RWHDERS to only re-read the input files that changed, using
+                inotify (Linux only). Otherwise, or if inotify is unavailable, every input file is polled each timestep.
+
+            .der_em_dispatch_deadband: DER-EM inputs (in Watts or VARs) are only sent to the model if they differ from
+                the value last sent to that DER-EM by more than this. Set to 0 to send every change.
+
+            .der_em_dispatch_max_message_size: The maximum number of DER-EM changes sent in a single difference
+                message. Larger sets of changes are split over several messages.
+
+            .timestep_updates_on_worker_thread: Set to True to run the on-timestep updates on a worker thread (see
+                TickScheduler), so the GridAPPS-D log callback only hands over each new timestep. Otherwise, the
+                updates run inside the callback.
+
+            .timestep_overrun_threshold: On-timestep updates taking longer than this (in seconds) are reported as
+                overruns.
+
+            .timestep_update_pipelining: Set to True to overlap the on-timestep update stages: DER-EM dispatch and
+                logging run concurrently, and the DER-S input requests for the next timestep are read in the
+                background meanwhile (see MCInputInterface.prefetch_der_s_input_requests()). Otherwise, the stages
+                run one after the other.
+
+            .der_s_read_workers: The number of DER-Ss whose input requests are read concurrently.
+
             .manual_service_filename: the .xml filename of the GOSensor manual service input file. Should be in MC root.
 
             .output_log_name: The name and location of the output logs. Rename before simulation with date/time, for example.
+
+            .output_log_format: 'npz' for compressed columnar logs (see ColumnarMeasurementLogWriter), or 'csv' for the
+                older .csv logs with one measurement dictionary per cell.
+
+            .output_log_csv_timestamp_format: 'epoch' to write .csv log timestamps as integer epoch seconds (format them
+                when reading, I.E. with EpochTimestampFormatter), or 'utc' for 'YYYY-MM-DD HH:MM:SS' UTC strings.
+
+            .output_log_background_writer: Set to True to write the logs on a dedicated writer thread (see
+                BackgroundLogWriter), so logging doesn't hold up the timestep updates. Otherwise, logs are written
+                directly during the timestep updates.
+
+            .output_log_queue_size: The number of timesteps that can be waiting for the writer thread.
+
+            .output_log_queue_full_policy: What happens to a new timestep when the writer thread's queue is full:
+                'block' waits for room, 'drop_oldest' discards the oldest waiting timestep, and 'spill' writes the new
+                timestep to a temporary spill file on disk until the writer thread catches up.
+
+            .output_log_batch_size: The maximum number of timesteps the writer thread writes between flushes.
+
+            .output_log_fsync_interval: How often (in seconds) the writer thread forces the log to disk.
+
+            .output_log_rotation_bytes: A new log segment is started once the current one holds this many bytes
+                (uncompressed). Set to 0 to disable size-based rotation.
+
+            .output_log_rotation_interval: A new log segment is started once the current one has been open for this
+                many (wall-clock) seconds. Set to 0 to disable time-based rotation.
+
+            .output_log_compression: 'gzip' to compress closed .csv log segments in the background, or None to leave
+                them as they are. (.npz segments are already compressed.)
+
+            .output_log_compression_workers: The number of worker threads compressing closed log segments.
+
+            .use_model_metadata_cache: Set to True to keep the model metadata queried during startup (the measurement
+                lookup tables and the DER-EM query results) in an on-disk cache (see ModelMetadataCache), so later
+                startups on an unchanged model skip those GridAPPS-D requests. The cache is deleted by
+                initialize_der_ems.sh, upload_model.py and the DER-EM and measurement insert/drop scripts in
+                DERScripts; delete the cache folder by hand after changing the model any other way.
+
+            .model_metadata_cache_folder: The folder the model metadata cache files are kept in, one file per line mRID.
+
+            .concurrent_startup: Set to True to run the independent startup steps concurrently (see
+                StartupOrchestrator), I.E. the GridAPPS-D queries alongside the DER-S input file loading and topology
+                parsing. Otherwise, the startup steps run one after the other. Step timings are printed either way.
+
+            .startup_workers: The maximum number of startup steps run at once.
+
+            .model_metadata_fingerprint_files: The model source files (relative to mc_file_directory, glob patterns
+                allowed) the cache is fingerprinted with: the feeder, its DER-EMs and its measurements. The cache is
+                discarded if any of them is changed, added or removed.
         """
         self.mc_file_directory = os.getcwd()
         self.config_file_path = f"{self.mc_file_directory}/Configuration/simulation_configuration.json"
@@ -64,9 +164,133 @@ class MCConfiguration:
             # 'EXAMPLEDERClassName': 'exampleDERObjectName'
         }
 
+        self.load_der_s_entry_points = False
+        self.rwhders_use_file_watcher = False
+        self.der_em_dispatch_deadband = 0
+        self.der_em_dispatch_max_message_size = 1000
         self.go_sensor_decision_making_manual_override = True
+        self.timestep_updates_on_worker_thread = True
+        self.timestep_overrun_threshold = 1.0
+        self.timestep_update_pipelining = True
+        self.der_s_read_workers = 8
         self.manual_service_filename = "manually_posted_service_input.xml"
         self.output_log_name = 'Logged Grid State Data/MeasOutputLogs_' + datetime.today().strftime("%d_%m_%Y_%H_%M")
+        self.output_log_format = 'npz'
+        self.output_log_csv_timestamp_format = 'epoch'
+        self.output_log_background_writer = True
+        self.output_log_queue_size = 32
+        self.output_log_queue_full_policy = 'block'
+        self.output_log_batch_size = 8
+        self.output_log_fsync_interval = 5.0
+        self.output_log_rotation_bytes = 64 * 2 ** 20
+        self.output_log_rotation_interval = 0
+        self.output_log_compression = 'gzip'
+        self.output_log_compression_workers = 2
+        self.concurrent_startup = True
+        self.startup_workers = 6
+        self.use_model_metadata_cache = True
+        self.model_metadata_cache_folder = f"{self.mc_file_directory}/ModelMetadata_Cache"
+        self.model_metadata_fingerprint_files = ['dss_files/Master.dss', 'DERScripts/EGoT13_der_psu.txt',
+                                                 'DERScripts/Meas/psu_13_node_feeder_*.txt',
+                                                 'DERScripts/Meas/*.json']
+
+
+class ModelMetadataCache:
+    """
+    On-disk cache of the model metadata the MC queries from GridAPPS-D during startup: the measurement lookup tables
+    (see EDMCore.establish_mrid_name_lookup_table()) and the DER-EM query results (see
+    DERAssignmentHandler.create_assignment_lookup_table()). These only change when the model is re-uploaded, so
+    startups on an unchanged model read them from a local .json file instead of waiting on the platform.
+
+    The cache file is keyed by the line mRID, and holds a fingerprint of the model: the cache format version, the line
+    mRID, and the size and mtime of each model source file listed in MCConfiguration. Any mismatch discards the cached
+    metadata, and it's queried and saved again. Re-uploading the model, the DER-EMs or the measurements
+    (initialize_der_ems.sh, upload_model.py, the insert/drop scripts in DERScripts) deletes the cache folder outright.
+
+    ATTRIBUTES:
+        .enabled: False if the cache is disabled in MCConfiguration. get() then always misses and save() does nothing.
+
+        .cache_file: The cache file for the current line mRID.
+
+        .fingerprint: The fingerprint of the current model (see compute_fingerprint()).
+
+        .metadata: The cached metadata, {key: value}. Loaded from the cache file if its fingerprint matches, otherwise
+            filled in by set() as the metadata is queried.
+
+        .modified: True if metadata was set since the cache file was loaded, I.E. the cache file needs to be saved.
+    """
+    cache_format_version = 1
+
+    # @profile
+    def __init__(self, cache_folder, line_mrid, fingerprint_files=(), enabled=True):
+        self.enabled = enabled
+        self.cache_file = os.path.join(cache_folder, f"{line_mrid}.json")
+        self.fingerprint = self.compute_fingerprint(line_mrid, fingerprint_files)
+        self.metadata = {}
+        self.modified = False
+        if self.enabled:
+            self.load()
+
+    @classmethod
+    def compute_fingerprint(cls, line_mrid, fingerprint_files):
+        """
+        Returns a hash of the cache format version, the line mRID and the size and mtime of each fingerprint file.
+        Missing files are part of the fingerprint as well.
+        """
+        fingerprint = hashlib.sha256(f"{cls.cache_format_version}\0{line_mrid}".encode())
+        for fingerprint_file in fingerprint_files:
+            try:
+                file_stat = os.stat(fingerprint_file)
+                fingerprint.update(f"\0{fingerprint_file}:{file_stat.st_size}:{file_stat.st_mtime_ns}".encode())
+            except OSError:
+                fingerprint.update(f"\0{fingerprint_file}:missing".encode())
+        return fingerprint.hexdigest()
+
+    # @profile
+    def load(self):
+        """
+        Loads the cache file if it exists and its fingerprint matches the current model. Unreadable or out of date
+        cache files are ignored (and overwritten by the next save()).
+        """
+        try:
+            with open(self.cache_file) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cache.get('fingerprint') == self.fingerprint:
+            self.metadata = cache.get('metadata', {})
+        else:
+            print("Model metadata cache is out of date, re-querying the model metadata.")
+
+    # @profile
+    def get(self, key):
+        """
+        ACCESSOR: Returns the cached metadata for the key, or None if it isn't cached.
+        """
+        return self.metadata.get(key)
+
+    # @profile
+    def set(self, key, value):
+        """
+        Caches metadata under the key. Written to disk by save().
+        """
+        self.metadata[key] = value
+        self.modified = True
+
+    # @profile
+    def save(self):
+        """
+        Writes the cache file if any metadata was set since it was loaded. Written to a temporary file first, then
+        renamed, so an interrupted run can't leave a half-written cache behind.
+        """
+        if not (self.enabled and self.modified):
+            return
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        temporary_cache_file = self.cache_file + '.tmp'
+        with open(temporary_cache_file, 'w') as f:
+            json.dump({'fingerprint': self.fingerprint, 'metadata': self.metadata}, f, separators=(',', ':'))
+        os.replace(temporary_cache_file, self.cache_file)
+        self.modified = False
 
 
 class EDMCore:
@@ -85,6 +309,8 @@ class EDMCore:
         self.config_parameters = None
         self.mrid_name_lookup_table = []
         self.cim_measurement_dict = []
+        self.measurement_enrichment_index = MappingProxyType({})
+        self.model_metadata_cache = None
         self.is_in_test_mode = False
     
     # @profile
@@ -109,23 +335,43 @@ class EDMCore:
         configuration from the file, instantiating all the (non-callback) objects, initializing DER-Ss, assigning
         DER-EMs and creating the association table, and connecting to the aggregator among others. See each method's
         docstring for more details.
-        """
-        self.connect_to_gridapps()
-        self.load_config_from_file()
-        self.initialize_line_mrid()
-        self.establish_mrid_name_lookup_table()
-        self.connect_to_simulation()
-        self.initialize_sim_start_time()
-        self.initialize_sim_time_step()
-        self.initialize_sim_mrid()
-        self.create_objects()
-        self.initialize_all_der_s()
-        derAssignmentHandler.create_assignment_lookup_table()
-        derAssignmentHandler.assign_all_ders()
-        derIdentificationManager.initialize_association_lookup_table()
-        mcOutputLog.set_log_name()
-        goTopologyProcessor.import_topology_from_file()
-        goSensor.load_manual_service_file()
+
+        UPDATE: The steps are run by a StartupOrchestrator, each after the steps it depends on. The local steps (the
+        DER-S input file loading, the topology parsing...) run concurrently with the GridAPPS-D requests if enabled in
+        MCConfiguration. The time taken by each step is printed at the end.
+
+        The GridAPPS-D requests themselves are kept on a single dependency chain, one after the other: the client names
+        each request's reply queue after the current time to the millisecond, so two concurrent requests can share a
+        reply queue and receive each other's responses (and they share the session's result format as well).
+        """
+        startup = StartupOrchestrator(mcConfiguration.startup_workers if mcConfiguration.concurrent_startup else 1)
+        startup.add_step('Connect to GridAPPS-D', self.connect_to_gridapps)
+        startup.add_step('Load configuration', self.load_config_from_file)
+        startup.add_step('Initialize line mRID', self.initialize_line_mrid, ['Load configuration'])
+        startup.add_step('Open model metadata cache', self.initialize_model_metadata_cache, ['Initialize line mRID'])
+        startup.add_step('Query measurements', self.establish_mrid_name_lookup_table,
+                         ['Connect to GridAPPS-D', 'Open model metadata cache'])
+        startup.add_step('Initialize sim start time', self.initialize_sim_start_time, ['Load configuration'])
+        startup.add_step('Initialize sim time step', self.initialize_sim_time_step, ['Load configuration'])
+        startup.add_step('Create objects', self.create_objects)
+        startup.add_step('Initialize DER-Ss', self.initialize_all_der_s, ['Create objects'])
+        startup.add_step('Query DER-EMs', lambda: derAssignmentHandler.create_assignment_lookup_table(),
+                         ['Query measurements', 'Create objects'])
+        startup.add_step('Connect to simulation', self.connect_to_simulation, ['Load configuration', 'Query DER-EMs'])
+        startup.add_step('Initialize sim mRID', self.initialize_sim_mrid, ['Connect to simulation'])
+        startup.add_step('Save model metadata cache', lambda: self.model_metadata_cache.save(),
+                         ['Query measurements', 'Query DER-EMs'])
+        startup.add_step('Assign DERs', lambda: derAssignmentHandler.assign_all_ders(),
+                         ['Initialize DER-Ss', 'Query DER-EMs'])
+        startup.add_step('Build association lookup table',
+                         lambda: derIdentificationManager.initialize_association_lookup_table(), ['Assign DERs'])
+        startup.add_step('Build measurement enrichment index', self.build_measurement_enrichment_index,
+                         ['Query measurements', 'Build association lookup table'])
+        startup.add_step('Set log name', lambda: mcOutputLog.set_log_name(), ['Create objects'])
+        startup.add_step('Import topology', lambda: goTopologyProcessor.import_topology_from_file(), ['Create objects'])
+        startup.add_step('Load manual service file', lambda: goSensor.load_manual_service_file(), ['Create objects'])
+        startup.run()
+        startup.print_step_timings()
 
     # @profile
     def load_config_from_file(self):
@@ -159,6 +405,19 @@ class EDMCore:
         self.line_mrid = self.config_parameters["power_system_config"]["Line_name"]
         return self.line_mrid
 
+    # @profile
+    def initialize_model_metadata_cache(self):
+        """
+        Opens the model metadata cache for the current line mRID (see ModelMetadataCache). Fingerprint file patterns
+        are expanded here; a pattern matching nothing is fingerprinted as a missing file.
+        """
+        fingerprint_files = []
+        for fingerprint_file in mcConfiguration.model_metadata_fingerprint_files:
+            fingerprint_file = os.path.join(mcConfiguration.mc_file_directory, fingerprint_file)
+            fingerprint_files.extend(sorted(glob.glob(fingerprint_file)) or [fingerprint_file])
+        self.model_metadata_cache = ModelMetadataCache(mcConfiguration.model_metadata_cache_folder, self.line_mrid,
+                                                       fingerprint_files, mcConfiguration.use_model_metadata_cache)
+
     # @profile
     def initialize_sim_start_time(self):
 
@@ -192,6 +451,12 @@ class EDMCore:
         dersHistoricalDataInput = DERSHistoricalDataInput(mcConfiguration)
         global rwhDERS
         rwhDERS = RWHDERS(mcConfiguration)
+        global dersRegistry
+        dersRegistry = DERSRegistry()
+        dersRegistry.load_der_s_from_configuration(mcConfiguration, existing_der_s={
+            'dersHistoricalDataInput': dersHistoricalDataInput,
+            'rwhDERS': rwhDERS
+        })
         global derAssignmentHandler
         derAssignmentHandler = DERAssignmentHandler()
         global derIdentificationManager
@@ -206,10 +471,10 @@ class EDMCore:
     # @profile
     def initialize_all_der_s(self):
         """
-        Calls the initialize_der_s() method for each DER-S listed in mcConfiguration.ders_obj_list.
+        Calls the initialize_der_s() method for each DER-S in the DERSRegistry.
         """
-        for key, value in mcConfiguration.ders_obj_list.items():
-            eval(value).initialize_der_s()
+        for der_s_name, der_s_object in dersRegistry.get_all_der_s():
+            dersRegistry.run_timed(der_s_name, 'initialize', der_s_object.initialize_der_s)
 
     # @profile
     def start_simulation(self):
@@ -239,7 +504,15 @@ class EDMCore:
         This currently creates two lookup dictionaries. mrid_name_lookup_table gets the real names of measurements for
         the measurement processor/logger. cim_measurement_dict gives a more fully fleshed out dictionary containing
         several parameters related to measurements that are appended to the measurement processor's current readings.
+
+        Both are read from the model metadata cache if it holds them (see ModelMetadataCache), and queried from
+        GridAPPS-D and cached otherwise.
         """
+        self.mrid_name_lookup_table = self.model_metadata_cache.get('object_measurements')
+        self.cim_measurement_dict = self.model_metadata_cache.get('cim_measurements')
+        if self.mrid_name_lookup_table is not None and self.cim_measurement_dict is not None:
+            return
+
         topic = "goss.gridappsd.process.request.data.powergridmodel"
         message = {
             "modelId": edmCore.initialize_line_mrid(),
@@ -257,6 +530,8 @@ class EDMCore:
         cim_dict = edmCore.gapps_session.get_response(config_api_topic, message, timeout=20)
         measdict = cim_dict['data']['feeders'][0]['measurements']
         self.cim_measurement_dict = measdict
+        self.model_metadata_cache.set('object_measurements', self.mrid_name_lookup_table)
+        self.model_metadata_cache.set('cim_measurements', self.cim_measurement_dict)
     # @profile
     def get_mrid_name_lookup_table(self):
         """
@@ -272,11 +547,292 @@ class EDMCore:
         """
         return self.cim_measurement_dict
 
+    # @profile
+    def build_measurement_enrichment_index(self):
+        """
+        Builds the measurement enrichment index from the two lookup tables (see establish_mrid_name_lookup_table())
+        and the DER-EM association data. The index maps each measurement mRID to a record containing everything the
+        measurement processor appends to that measurement: its name, conducting equipment, bus, phases, measurement
+        type and, for DER-EM measurements, the associated inverter control mRID and DER input unique ID.
+
+        The index is built once during startup, after the DER-EMs are assigned, and is read-only afterwards. Each
+        measurement message then only costs one dictionary merge per measurement (see EDMMeasurementProcessor).
+        """
+        cim_measurement_lookup_dict = {item['mRID']: item for item in self.cim_measurement_dict}
+        assignment_lookup_dict = {item['DER_name']: item for item in
+                                  derAssignmentHandler.get_assignment_lookup_table()}
+        enrichment_index = {}
+
+        for item in self.mrid_name_lookup_table:
+            record = {'Measurement name': item['name']}
+            cim_measurement = cim_measurement_lookup_dict.get(item['measid'])
+            if cim_measurement is not None:
+                record['Conducting Equipment Name'] = cim_measurement['ConductingEquipment_name']
+                record['Bus'] = cim_measurement['ConnectivityNode']
+                record['Phases'] = cim_measurement['phases']
+                record['MeasType'] = cim_measurement['measurementType']
+                assigned_der_em = assignment_lookup_dict.get(record['Conducting Equipment Name'])
+                if assigned_der_em is not None and 'BatteryUnit' in record['Measurement name']:
+                    record['Inverter Control mRID'] = assigned_der_em['DER_mRID']
+                    record['DER Input Unique ID'] = derIdentificationManager.get_meas_name(
+                        assigned_der_em['DER_mRID'])
+            enrichment_index[item['measid']] = record
+
+        self.measurement_enrichment_index = MappingProxyType(enrichment_index)
+
+    # @profile
+    def get_measurement_enrichment_index(self):
+        """
+        ACCESSOR METHOD: Returns the (read-only) measurement enrichment index.
+        """
+        return self.measurement_enrichment_index
+
     # @profile
     def put_in_test_mode(self):
         self.is_in_test_mode = True
 
 
+class StartupOrchestrator:
+    """
+    Runs the startup steps (see EDMCore.sim_start_up_process()) as a dependency graph: each step is started as soon as
+    every step it depends on has finished, on a thread pool, so independent steps (I.E. GridAPPS-D queries and local
+    file loading) overlap. Steps must be added after the steps they depend on, so the order they're added in is always
+    a valid order to run them in one after the other (which is what happens with a single worker).
+
+    If a step fails, no further steps are started; the steps already running are waited for, and the exception is
+    re-raised.
+
+    ATTRIBUTES:
+        .max_workers: The maximum number of steps run at once. With 1, the steps run on the calling thread, in the
+            order they were added.
+
+        .steps: Step name -> (function, names of the steps it depends on), in the order the steps were added.
+
+        .step_timings: Step name -> (start, end), in seconds since run() was called.
+
+        .start_time: The perf_counter() time run() was called.
+
+        .timing_lock: Guards step_timings.
+    """
+    # @profile
+    def __init__(self, max_workers=1):
+        self.max_workers = max(1, int(max_workers))
+        self.steps = {}
+        self.step_timings = {}
+        self.start_time = None
+        self.timing_lock = threading.Lock()
+
+    # @profile
+    def add_step(self, name, function, depends_on=()):
+        """
+        Adds a step, run by calling function() once every step in depends_on has finished.
+        """
+        if name in self.steps:
+            raise ValueError(f"Startup step {name} was already added")
+        missing_steps = [step for step in depends_on if step not in self.steps]
+        if missing_steps:
+            raise ValueError(f"Startup step {name} depends on steps that weren't added before it: {missing_steps}")
+        self.steps[name] = (function, set(depends_on))
+
+    # @profile
+    def run_step(self, name):
+        start = time.perf_counter() - self.start_time
+        try:
+            self.steps[name][0]()
+        finally:
+            with self.timing_lock:
+                self.step_timings[name] = (start, time.perf_counter() - self.start_time)
+
+    # @profile
+    def run(self):
+        """
+        Runs every step, each after the steps it depends on.
+        """
+        self.start_time = time.perf_counter()
+        if self.max_workers == 1:
+            for name in self.steps:
+                try:
+                    self.run_step(name)
+                except Exception:
+                    print(f"FATAL ERROR: Startup step {name} failed.")
+                    raise
+            return
+
+        waiting_steps = {name: depends_on for name, (function, depends_on) in self.steps.items()}
+        finished_steps = set()
+        running_steps = {}
+        failure = None
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='startup') as pool:
+            while waiting_steps or running_steps:
+                if failure is None:
+                    for name in [name for name, depends_on in waiting_steps.items() if depends_on <= finished_steps]:
+                        del waiting_steps[name]
+                        running_steps[pool.submit(self.run_step, name)] = name
+                if not running_steps:
+                    break
+                done, _ = wait(running_steps, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running_steps.pop(future)
+                    if future.exception() is None:
+                        finished_steps.add(name)
+                    elif failure is None:
+                        failure = (name, future.exception())
+        if failure is not None:
+            print(f"FATAL ERROR: Startup step {failure[0]} failed.")
+            raise failure[1]
+
+    # @profile
+    def get_step_timings(self):
+        """
+        ACCESSOR: Returns {step name: (start, end)}, in seconds since the steps started running, in start order.
+        """
+        with self.timing_lock:
+            return dict(sorted(self.step_timings.items(), key=lambda item: item[1][0]))
+
+    # @profile
+    def print_step_timings(self):
+        """
+        Prints when each step started and how long it took, and the total startup time against the time the steps
+        would have taken one after the other.
+        """
+        step_timings = self.get_step_timings()
+        print("Startup step timings:")
+        for name, (start, end) in step_timings.items():
+            print(f"    {name:<40}started at {start:7.3f} s, took {end - start:7.3f} s")
+        total_time = max((end for start, end in step_timings.values()), default=0.0)
+        sequential_time = sum(end - start for start, end in step_timings.values())
+        print(f"Startup took {total_time:.3f} s ({sequential_time:.3f} s of steps, {self.max_workers} workers).")
+
+
+class TickScheduler:
+    """
+    Runs the on-timestep updates (see EDMTimeKeeper.run_timestep_updates()) on a dedicated worker thread. The
+    GridAPPS-D log callback only calls submit_tick() with the new simulation time, so slow updates no longer hold up
+    the STOMP listener thread (and the log messages behind it).
+
+    Only the newest timestep is kept waiting: if a timestep arrives while the previous one is still waiting to run, the
+    older one is skipped (coalesced) rather than building a backlog, and the updates catch up with simulation time.
+    Timesteps whose updates take longer than overrun_threshold seconds are reported as overruns, with their slowest
+    stage.
+
+    ATTRIBUTES:
+        .pending_sim_time: The simulation time of the timestep waiting to run, or None.
+
+        .stage_timings: For each update stage, [number of runs, total seconds, maximum seconds].
+
+        .tick_metrics: Timesteps submitted, run, coalesced, overrun and failed, and the maximum delay (in seconds)
+            between a timestep being submitted and its updates starting.
+    """
+
+    # @profile
+    def __init__(self, run_tick_function, overrun_threshold):
+        self.run_tick_function = run_tick_function
+        self.overrun_threshold = overrun_threshold
+        self.pending_sim_time = None
+        self.pending_submit_time = None
+        self.is_running_tick = False
+        self.is_stopping = False
+        self.tick_condition = threading.Condition()
+        self.stage_timings = {}
+        self.tick_metrics = {'submitted': 0, 'run': 0, 'coalesced': 0, 'overrun': 0, 'failed': 0, 'max_delay': 0.0}
+        self.worker_thread = threading.Thread(target=self.run, name='TickScheduler', daemon=True)
+
+    # @profile
+    def start(self):
+        self.worker_thread.start()
+
+    # @profile
+    def submit_tick(self, sim_time):
+        """
+        Hands a new timestep to the worker thread, replacing (coalescing) any timestep that hasn't started yet.
+        """
+        with self.tick_condition:
+            if self.pending_sim_time is not None:
+                self.tick_metrics['coalesced'] += 1
+                print(f"Timestep {self.pending_sim_time} skipped: updates are behind simulation time.")
+            self.pending_sim_time = sim_time
+            self.pending_submit_time = time.perf_counter()
+            self.tick_metrics['submitted'] += 1
+            self.tick_condition.notify_all()
+
+    # @profile
+    def run(self):
+        """
+        The worker thread's main loop. Ends when stopped, after running the timestep still waiting (if any).
+        """
+        while True:
+            with self.tick_condition:
+                while self.pending_sim_time is None and not self.is_stopping:
+                    self.tick_condition.wait()
+                if self.pending_sim_time is None:
+                    break
+                sim_time = self.pending_sim_time
+                delay = time.perf_counter() - self.pending_submit_time
+                self.pending_sim_time = None
+                self.is_running_tick = True
+
+            start = time.perf_counter()
+            try:
+                stage_durations = self.run_tick_function(sim_time)
+            except Exception:
+                traceback.print_exc()
+                self.tick_metrics['failed'] += 1
+                stage_durations = {}
+            self.record_tick(sim_time, time.perf_counter() - start, delay, stage_durations)
+
+            with self.tick_condition:
+                self.is_running_tick = False
+                self.tick_condition.notify_all()
+
+    # @profile
+    def record_tick(self, sim_time, duration, delay, stage_durations):
+        """
+        Records the stage timings of a timestep, and reports it if it overran.
+        """
+        self.tick_metrics['run'] += 1
+        self.tick_metrics['max_delay'] = max(self.tick_metrics['max_delay'], delay)
+        for stage_name, stage_duration in stage_durations.items():
+            timing = self.stage_timings.setdefault(stage_name, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += stage_duration
+            timing[2] = max(timing[2], stage_duration)
+        if duration > self.overrun_threshold:
+            self.tick_metrics['overrun'] += 1
+            slowest_stage = max(stage_durations, key=stage_durations.get, default=None)
+            print(f"Timestep {sim_time} overran: {duration:.3f} s (slowest stage: {slowest_stage}, "
+                  f"{stage_durations.get(slowest_stage, 0.0):.3f} s)")
+
+    # @profile
+    def wait_until_idle(self):
+        """
+        Blocks until no timestep is waiting or running.
+        """
+        with self.tick_condition:
+            while self.pending_sim_time is not None or self.is_running_tick:
+                self.tick_condition.wait()
+
+    # @profile
+    def stop(self):
+        """
+        Runs the timestep still waiting (if any), then stops the worker thread.
+        """
+        with self.tick_condition:
+            self.is_stopping = True
+            self.tick_condition.notify_all()
+        if self.worker_thread.is_alive() and self.worker_thread is not threading.current_thread():
+            self.worker_thread.join()
+
+    # @profile
+    def get_report(self):
+        """
+        Returns the timestep metrics and the mean and maximum duration (in seconds) of each update stage.
+        """
+        report = dict(self.tick_metrics)
+        report['stages'] = {stage_name: {'mean': total / count, 'max': maximum}
+                            for stage_name, (count, total, maximum) in self.stage_timings.items()}
+        return report
+
+
 class EDMTimeKeeper(object):
     """
     CALLBACK CLASS. GridAPPS-D provides logging messages to this callback class. on_message() filters these down
@@ -294,7 +850,15 @@ class EDMTimeKeeper(object):
 
         .sim_start_time: The (from config) simulation start timecode.
 
-        .sim_current_time: The current timestamp. Initialized to the sim start time.
+        .sim_current_time: The timestamp of the timestep being updated. Initialized to the sim start time.
+
+        .latest_sim_time: The timestamp of the newest timestep received from GridAPPS-D. Ahead of .sim_current_time
+               while that timestep's updates wait for (or are skipped by) the TickScheduler.
+
+        .tick_scheduler: The TickScheduler running the on-timestep updates, or None when they run in the callback (see
+               MCConfiguration.timestep_updates_on_worker_thread).
+
+        .stage_pool: The worker threads running concurrent update stages (see get_timestep_update_stages()).
 
         .previous_log_message: A buffer containing the previous log message. Necessary to fix a double incrementation
                glitch caused by GridAPPS-D providing the same log multiple times.
@@ -306,8 +870,14 @@ class EDMTimeKeeper(object):
     def __init__(self, edmCoreObj):
         self.sim_start_time = edmCoreObj.get_sim_start_time()
         self.sim_current_time = self.sim_start_time
+        self.latest_sim_time = self.sim_start_time
         self.previous_log_message = None
         self.edmCoreObj = edmCoreObj
+        self.tick_scheduler = None
+        self.stage_pool = None
+        if mcConfiguration.timestep_updates_on_worker_thread is True:
+            self.tick_scheduler = TickScheduler(self.run_timestep_updates, mcConfiguration.timestep_overrun_threshold)
+            self.tick_scheduler.start()
 
     # @profile
     def on_message(self, sim, message):
@@ -324,9 +894,11 @@ class EDMTimeKeeper(object):
         # @profile
         def end_program():
             """
-            Ends the program by closing out the logs and setting the global end program flag to true, breaking the
-            main loop.
+            Ends the program by finishing the on-timestep updates, closing out the logs and setting the global end
+            program flag to true, breaking the main loop.
             """
+            self.stop_tick_scheduler()
+            print(f"DER-S timing report: {dersRegistry.get_timing_report()}")
             mcOutputLog.close_out_logs()
             global end_program
             end_program = True
@@ -340,10 +912,15 @@ class EDMTimeKeeper(object):
                 print(log_message)
                 if log_message != self.previous_log_message:  # Msgs get spit out twice for some reason. Only reads one.
                     self.increment_sim_current_time()
-                    print("\nCurrent timestep:\t" + self.sim_current_time)
-                    self.perform_all_on_timestep_updates()
+                    print("\nCurrent timestep:\t" + self.latest_sim_time)
+                    if self.tick_scheduler is not None:
+                        self.tick_scheduler.submit_tick(self.latest_sim_time)
+                    else:
+                        self.run_timestep_updates(self.latest_sim_time)
                     self.previous_log_message = log_message
                     if edmCore.is_in_test_mode is True:
+                        if self.tick_scheduler is not None:
+                            self.tick_scheduler.wait_until_idle()
                         print("PAUSING SIMULATION FOR TESTING")
                         edmCore.sim_session.stop()
                         global end_program
@@ -366,11 +943,12 @@ class EDMTimeKeeper(object):
     # @profile
     def increment_sim_current_time(self):
         """
-        Increments the current simulation time by 1.
+        Increments the latest received simulation time by 1. (.sim_current_time follows when that timestep's updates
+        run; see run_timestep_updates().)
         """
-        current_int_time = int(self.sim_current_time)
+        current_int_time = int(self.latest_sim_time)
         current_int_time += 1
-        self.sim_current_time = str(current_int_time)
+        self.latest_sim_time = str(current_int_time)
 
     # @profile
     def get_sim_current_time(self):
@@ -379,26 +957,88 @@ class EDMTimeKeeper(object):
         """
         return self.sim_current_time
 
+    # @profile
+    def run_timestep_updates(self, sim_time):
+        """
+        Sets the current simulation time to sim_time and performs the on-timestep updates. Called by the TickScheduler
+        worker thread (or directly by the callback). Returns the duration of each update stage in seconds.
+        """
+        self.sim_current_time = sim_time
+        return self.perform_all_on_timestep_updates()
+
+    # @profile
+    def stop_tick_scheduler(self):
+        """
+        Lets the TickScheduler finish its waiting timestep, stops it and prints its timing report.
+        """
+        if self.tick_scheduler is not None:
+            self.tick_scheduler.stop()
+            print(f"Timestep update report: {self.tick_scheduler.get_report()}")
+
+    # @profile
+    def get_timestep_update_stages(self):
+        """
+        Returns the on-timestep update stages, as (stage name, method, concurrent) in the order they run. When the
+        updates are pipelined (see MCConfiguration.timestep_update_pipelining), consecutive concurrent stages run
+        at the same time; every stage still starts after the stages before it (other than its own concurrent group)
+        have finished.
+        """
+        return [
+            ('DER-S inputs', mcInputInterface.update_all_der_s_status, False),
+            ('DER-EM dispatch', mcInputInterface.update_all_der_em_status, True),
+            ('Logging', mcOutputLog.update_logs, True),
+            ('Service decisions', goSensor.make_service_request_decision, False),
+            ('Service collection', goOutputInterface.get_all_posted_service_requests, False),
+            ('Service output', goOutputInterface.send_service_request_messages, False)
+        ]
+
+    # @profile
+    def run_timed_stage(self, stage_method):
+        """
+        Runs an update stage and returns its duration in seconds.
+        """
+        start = time.perf_counter()
+        stage_method()
+        return time.perf_counter() - start
+
+    # @profile
+    def run_concurrent_stages(self, concurrent_stages, stage_durations):
+        """
+        Runs a group of concurrent stages on the stage pool and waits for all of them.
+        """
+        if self.stage_pool is None:
+            self.stage_pool = ThreadPoolExecutor(thread_name_prefix='TimestepStage')
+        futures = [(stage_name, self.stage_pool.submit(self.run_timed_stage, stage_method))
+                   for stage_name, stage_method in concurrent_stages]
+        for stage_name, future in futures:
+            stage_durations[stage_name] = future.result()
+
     # @profile
     def perform_all_on_timestep_updates(self):
         """
         ENCAPSULATION: Calls all methods that update the system each timestep (second). New processes should be added
-        here if they need to be ongoing, I.E. once per second through the simulation.
+        to get_timestep_update_stages() if they need to be ongoing, I.E. once per second through the simulation.
+        Returns the duration of each stage in seconds.
 
         NOTE: DOES NOT INCLUDE MEASUREMENT READING/PROCESSING. Those are done once every three seconds due to the way
         GridAPPS-D is designed and are independent of the simulation timekeeper processes. See EDMMeasurementProcessor.
         """
         print("Performing on-timestep updates:")
         self.edmCoreObj.sim_current_time = self.sim_current_time
-        mcInputInterface.update_all_der_s_status()
-        mcInputInterface.update_all_der_em_status()
-        # goSensor.update_sensor_states()
-        print("Calling log update...")
-        mcOutputLog.update_logs()
-        goSensor.make_service_request_decision()
-        goOutputInterface.get_all_posted_service_requests()
-        goOutputInterface.send_service_request_messages()
-        
+        stage_durations = {}
+        concurrent_stages = []
+        for stage_name, stage_method, concurrent in self.get_timestep_update_stages():
+            if concurrent is True and mcConfiguration.timestep_update_pipelining is True:
+                concurrent_stages.append((stage_name, stage_method))
+                continue
+            if concurrent_stages:
+                self.run_concurrent_stages(concurrent_stages, stage_durations)
+                concurrent_stages = []
+            stage_durations[stage_name] = self.run_timed_stage(stage_method)
+        if concurrent_stages:
+            self.run_concurrent_stages(concurrent_stages, stage_durations)
+        return stage_durations
+
 
 class EDMMeasurementProcessor(object):
     """
@@ -420,28 +1060,16 @@ class EDMMeasurementProcessor(object):
         .current_measurements: Contains the measurements taken from the GridAPPS-D message. Written in the function
             parse_message_into_current_measurements.
 
-        .mrid_name_lookup_table: Read from EDMCore. Used to append informative data to each measurement.
-
-        .measurement_lookup_table: Read from EDMCore. Used to append (different) information to each measurement.
-
-        .measurement_mrids: Measurement dictionaries provided by GridAPPS-D use mRIDs as keys for each measurement.
-            This contains a list of those keys and is used to replace those mRIDs with human-readable names.
-
-        .measurement_names: A list of human-readable measurement names. See measurement_mrids.
-
-        .assignment_lookup_table: Read from DERAssignmentHandler. Used to append DER-S to DER-EM association data to
-            each measurement for logging and troubleshooting purposes.
+        .measurement_enrichment_index: Read from EDMCore. Maps each measurement mRID to the informative data (names,
+            location, measurement type and DER-S to DER-EM association data) appended to that measurement for logging
+            and troubleshooting purposes. See EDMCore.build_measurement_enrichment_index().
     """
     
     # @profile
     def __init__(self):
         self.measurement_timestamp = None
         self.current_measurements = None
-        self.mrid_name_lookup_table = []
-        self.measurement_lookup_table = []
-        self.measurement_mrids = []
-        self.measurement_names = []
-        self.der_assignment_lookup_table = []
+        self.measurement_enrichment_index = edmCore.get_measurement_enrichment_index()
     # @profile
     def on_message(self, headers, measurements):
         """
@@ -460,94 +1088,150 @@ class EDMMeasurementProcessor(object):
     def parse_message_into_current_measurements(self, measurement_message):
         """
         The measurement message from GridAPPS-D is pretty ugly. This method pulls out just the stuff we need, and then
-        calls methods to append names, association/location info, etc. Basically, this turns the raw input data into
+        calls the method to append names, association/location info, etc. Basically, this turns the raw input data into
         the fully formatted edmMeasurementProcessor.current_measurements dictionary which is passed to the logger and GO
         """
         
         self.current_measurements = measurement_message['message']['measurements']
         self.measurement_timestamp = measurement_message['message']['timestamp']
         self.append_names()
-        self.append_association_data()
 
     # @profile
     def append_names(self):
         """
-        Adds a bunch of extra important information to each measurement's value dictionary.
+        Adds a bunch of extra important information to each measurement's value dictionary. Everything appended is
+        precomputed in the measurement enrichment index, including the association data, so this is a single merge
+        per measurement. Measurements missing from the index are left as they are.
         """
-        self.mrid_name_lookup_table = edmCore.get_mrid_name_lookup_table()
-        mrid_name_lookup_dict = {}
-        
-        for item in self.mrid_name_lookup_table:
-            measid = item['measid']
-            mrid_name_lookup_dict[measid] = item
-        
-        self.measurement_lookup_table = edmCore.get_cim_measurement_dict()
-        mrid_measurement_lookup_dict = {}
-        
-        for item in self.measurement_lookup_table:
-            mrid = item['mRID']
-            mrid_measurement_lookup_dict[mrid] = item
-        
-        self.measurement_mrids = self.current_measurements
-        self.measurement_mrids = self.current_measurements.keys()
+        for mrid, measurement in self.current_measurements.items():
+            record = self.measurement_enrichment_index.get(mrid)
+            if record is not None:
+                measurement.update(record)
 
+class InputFileTail:
+    """
+    Follows a single DER-S input file that is appended to during the simulation (see RWHDERS). Keeps the byte offset
+    already read, so each update only reads and parses the newly appended lines; if the file's size and mtime are
+    unchanged since the last update, nothing is read at all.
 
-        for i in self.measurement_mrids:
-            try:
-                lookup_mrid = mrid_name_lookup_dict[i]
-                # lookup_mrid = next(item for item in self.mrid_name_lookup_table if item['measid'] == i)
-                
-            except StopIteration:
-                print(f"\n\n-------- lookup_mrid --------")
-            lookup_name = lookup_mrid['name']
-            self.measurement_names.append(lookup_name)
-        
-        self.measurement_mrids = dict(zip(list(self.measurement_mrids), self.measurement_names))
-        '''
-        List all mRIDs (keys) associated with their equipment names(values) --> (Dictionary type obviously!)
-        '''
-        for key, value in self.measurement_mrids.items():
-            try:
-                self.current_measurements[key]['Measurement name'] = value
-                measurement_table_dict_containing_mrid = mrid_measurement_lookup_dict[key]
+    ATTRIBUTES:
+        .file_path: The input file being followed.
 
+        .offset: The number of bytes of the file already read.
 
-                self.current_measurements[key]['Conducting Equipment Name'] = measurement_table_dict_containing_mrid[
-                    'ConductingEquipment_name']
-                self.current_measurements[key]['Bus'] = measurement_table_dict_containing_mrid[
-                    'ConnectivityNode']
-                self.current_measurements[key]['Phases'] = measurement_table_dict_containing_mrid[
-                    'phases']
-                self.current_measurements[key]['MeasType'] = measurement_table_dict_containing_mrid[
-                    'measurementType']
-            except StopIteration:
-                print("\n\n ---------- Measurements updated with amplifying information ---------- \n\n")
+        .file_stat: The (inode, size, mtime) of the file as of the last update. Used to skip unchanged files.
 
-    # @profile
-    def append_association_data(self):
-        """
-        Appends association data.
-        """
+        .partial_line: Bytes after the last newline. Kept until the rest of the line is appended, but still parsed as
+           the latest row, since the writer does not always end the file with a newline.
 
-        self.assignment_lookup_table = derAssignmentHandler.get_assignment_lookup_table()
-        assignment_lookup_dict = {}
-        for item in self.assignment_lookup_table:
-            
-            name = item['DER_name']
-            assignment_lookup_dict[name] = item
+        .latest_values: The most recent value read for each key (I.E. {"P": "4500"}).
+    """
 
-        for key, value in self.current_measurements.items(): # current_measurements contains all loads
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.offset = 0
+        self.file_stat = None
+        self.partial_line = b''
+        self.latest_values = {}
+
+    def read_new_rows(self):
+        """
+        Reads whatever was appended to the file since the last call, and updates latest_values. Returns True if the
+        file changed. A file that changed without growing was rewritten rather than appended to, so it is read again
+        from the start.
+        """
+        stat = os.stat(self.file_path)
+        file_stat = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if file_stat == self.file_stat:
+            return False
+        if self.file_stat is None or stat.st_ino != self.file_stat[0] or stat.st_size <= self.offset:
+            self.offset = 0
+            self.partial_line = b''
+        self.file_stat = file_stat
+
+        with open(self.file_path, 'rb') as input_file:
+            input_file.seek(self.offset)
+            new_bytes = input_file.read()
+        self.offset += len(new_bytes)
+
+        new_bytes = self.partial_line + new_bytes
+        last_newline = new_bytes.rfind(b'\n') + 1
+        self.partial_line = new_bytes[last_newline:]
+        new_lines = new_bytes[:last_newline].decode().splitlines()
+        if self.partial_line:
+            new_lines.append(self.partial_line.decode(errors='replace'))
+        for row in csv.reader(new_lines):
+            if len(row) >= 2:
+                self.latest_values[row[0]] = row[1]
+        return True
+
+
+class InotifyWatcher:
+    """
+    A thin ctypes wrapper around Linux inotify. Watches a single folder and reports the names of the files written
+    to, created in or moved into it since the last call. Used by RWHDERS in file watcher mode (see
+    MCConfiguration.rwhders_use_file_watcher). Raises OSError if inotify is unavailable.
 
+    ATTRIBUTES:
+        .inotify_fd: The (non-blocking) inotify file descriptor.
+    """
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, folder):
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux.")
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.inotify_fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.inotify_fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        watch_mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if libc.inotify_add_watch(self.inotify_fd, os.fsencode(folder), watch_mask) < 0:
+            error_number = ctypes.get_errno()
+            os.close(self.inotify_fd)
+            raise OSError(error_number, f"inotify_add_watch failed for {folder}")
+
+    def get_changed_filenames(self):
+        """
+        Drains the pending events and returns the set of changed filenames. Returns None if the kernel's event queue
+        overflowed, in which case any file may have changed.
+        """
+        changed_filenames = set()
+        while True:
             try:
-                assignment_dict_with_given_name = assignment_lookup_dict[self.current_measurements[key]['Conducting Equipment Name']]
+                events = os.read(self.inotify_fd, 65536)
+            except BlockingIOError:
+                return changed_filenames
+            offset = 0
+            while offset < len(events):
+                watch_descriptor, mask, cookie, name_length = self.EVENT_HEADER.unpack_from(events, offset)
+                offset += self.EVENT_HEADER.size
+                if mask & self.IN_Q_OVERFLOW:
+                    changed_filenames = None
+                elif changed_filenames is not None:
+                    changed_filenames.add(os.fsdecode(events[offset:offset + name_length].rstrip(b'\0')))
+                offset += name_length
+            if changed_filenames is None:
+                self.drain_events()
+                return None
+
+    def drain_events(self):
+        """
+        Discards all pending events.
+        """
+        try:
+            while os.read(self.inotify_fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
 
-                if 'BatteryUnit' in value['Measurement name']:
-                    self.current_measurements[key]['Inverter Control mRID'] = assignment_dict_with_given_name['DER_mRID']
-                    DER_input_name = derIdentificationManager.get_meas_name(assignment_dict_with_given_name['DER_mRID'])
-                    self.current_measurements[key]['DER Input Unique ID'] = DER_input_name
+    def close(self):
+        os.close(self.inotify_fd)
 
-            except KeyError:
-                pass        
 
 class RWHDERS:
     """
@@ -588,6 +1272,17 @@ class RWHDERS:
         .input_identification_dict: a dictionary of identification information for each DER input. The keys are the
            serial numbers parsed from each file name, and the values include the buses and the filename. Used during
            assignment, and also on time step to get the right data from the right file for each DER's unique ID.
+
+        .input_file_tails: An InputFileTail for each DER input's file, keyed by serial number. Used on time step so
+           only newly appended lines are read.
+
+        .input_filename_lookup_dict: The reverse of input_identification_dict: each input filename's serial number.
+
+        .file_watcher: In file watcher mode (see MCConfiguration.rwhders_use_file_watcher), an InotifyWatcher on the
+           input folder. None when polling.
+
+        .changed_input_files: Serial numbers of the DER inputs whose files must be read on the next time step. In file
+           watcher mode, this is filled from the watcher's events; initially, it contains every DER input.
     
     UPDATE:
 
@@ -626,16 +1321,34 @@ class RWHDERS:
         self.der_em_input_request = {}
         self.input_file_path = mcConfiguration.mc_file_directory + r"/RWHDERS Inputs/"
         self.input_identification_dict = {}
+        self.input_file_tails = {}
+        self.use_file_watcher = mcConfiguration.rwhders_use_file_watcher
+        self.file_watcher = None
+        self.input_filename_lookup_dict = {}
+        self.changed_input_files = set()
 
 
     def initialize_der_s(self):
         """
         This function (with this specific name) is required in each DER-S used by the ME. The EDMCore's initialization
         process calls this function for each DER-S activated in MCConfig to perform initialization tasks. This does not
-        include DER-EM assignment (see assign_der_s_to_der_em). In this case, all this function does is call
-        the parse_input_file_names_for_assignment() function. See below.
+        include DER-EM assignment (see assign_der_s_to_der_em). In this case, this function calls the
+        parse_input_file_names_for_assignment() function, and starts the file watcher if it is enabled. See below.
         """
         self.parse_input_file_names_for_assignment()
+        if self.use_file_watcher is True:
+            self.start_file_watcher()
+
+    def start_file_watcher(self):
+        """
+        Starts watching the input folder for changed files. If inotify is unavailable, RWHDERS falls back to polling
+        every input file each time step.
+        """
+        try:
+            self.file_watcher = InotifyWatcher(self.input_file_path)
+        except (OSError, AttributeError, TypeError) as e:
+            print(f"RWHDERS file watcher unavailable ({e}). Polling the input files instead.")
+            self.file_watcher = None
 
     def assign_der_s_to_der_em(self):
         """
@@ -647,12 +1360,10 @@ class RWHDERS:
         (see self.parse_input_file_names_for_assignment())
         """
 
-        for key, value in self.input_identification_dict.items():
-            der_id = key
-            der_bus = value['Bus']
-            der_mrid = derAssignmentHandler.get_mRID_for_der_on_bus(der_bus)
-            der_being_assigned = {der_id: der_mrid}
-            derAssignmentHandler.append_new_values_to_association_table(der_being_assigned)
+        der_s_manifest = {der_id: value['Bus'] for der_id, value in self.input_identification_dict.items()}
+        association_table, _ = derAssignmentHandler.assign_der_s_manifest(der_s_manifest)
+        for der_id, der_mrid in association_table.items():
+            derAssignmentHandler.append_new_values_to_association_table({der_id: der_mrid})
 
     def parse_input_file_names_for_assignment(self):
         """
@@ -681,6 +1392,10 @@ class RWHDERS:
             parsed_filename_list.append({g1: {"Filepath": i, "Bus": g2}})
         for item in parsed_filename_list:
             self.input_identification_dict.update(item) # DER serial number as keys, values are dict (bus and file names as keys)
+        for key, value in self.input_identification_dict.items():
+            self.input_file_tails[key] = InputFileTail(self.input_file_path + value['Filepath'])
+        self.input_filename_lookup_dict = {value['Filepath']: key for key, value in self.input_identification_dict.items()}
+        self.changed_input_files = set(self.input_file_tails)
         
         
 
@@ -692,20 +1407,38 @@ class RWHDERS:
         UPDATE:
 
         Since the input files are updated in real time, the DERMS appends the new values to the existing input files.
-        Therefore, this function reads the last line from each file in the input identification dict, and puts it
-        in a list of readable by the MCInputInterface.
+        Therefore, this function reads the latest value from each file in the input identification dict, and puts it
+        in a list of readable by the MCInputInterface. Only the lines appended since the last time step are read (see
+        InputFileTail), and only the DERs whose files changed are put in the input request. In file watcher mode, only
+        the files reported by the watcher are checked at all.
         """
 
         self.der_em_input_request.clear()
-        for key, value in self.input_identification_dict.items():
-            with open(self.input_file_path + value['Filepath'], newline='') as csvfile:
-                der_input_reader = csv.reader(csvfile)
-                for row in der_input_reader:
-                    current_der_input = {row[0]: row[1]}
-            current_der_real_power = current_der_input['P']
-            current_der_input_request = {key:current_der_real_power}
-            self.der_em_input_request.update(current_der_input_request)
+        for key in self.get_changed_input_files():
+            input_file_tail = self.input_file_tails[key]
+            if input_file_tail.read_new_rows():
+                current_der_real_power = input_file_tail.latest_values['P']
+                current_der_input_request = {key:current_der_real_power}
+                self.der_em_input_request.update(current_der_input_request)
+
 
+    def get_changed_input_files(self):
+        """
+        Returns the serial numbers of the DER inputs whose files should be checked this time step: all of them when
+        polling, or when the watcher's event queue overflowed; otherwise, only those the watcher reported as changed.
+        """
+        if self.file_watcher is None:
+            return self.input_file_tails.keys()
+        changed_filenames = self.file_watcher.get_changed_filenames()
+        if changed_filenames is None:
+            self.changed_input_files.update(self.input_file_tails)
+        else:
+            for filename in changed_filenames:
+                if filename in self.input_filename_lookup_dict:
+                    self.changed_input_files.add(self.input_filename_lookup_dict[filename])
+        changed_input_files = self.changed_input_files
+        self.changed_input_files = set()
+        return changed_input_files
 
     def get_input_request(self):
         """
@@ -715,6 +1448,10 @@ class RWHDERS:
         UPDATE:
 
         simulated DERs do not provide VARs. Therefore the VARs input request is empty.
+
+        There is no sim_time argument: the input files always hold the latest inputs, and reading them consumes the
+        changed files (and moves the file offsets forward), so RWHDERS must not be read ahead (see
+        MCInputInterface.prefetch_der_s_input_requests()). It is always read for the current timestep.
         """
         self.ders_vars = {}
         self.update_der_em_input_request()
@@ -741,9 +1478,20 @@ class DERSHistoricalDataInput:
 
         .input_file_path: The folder in which the DERSHistoricalDataInput files are located.
 
-        .input_table: The input files are in .csv format; the csv reader reads these files into a table here.
+        .historical_data_cache_file: A consolidated binary (.npz) copy of the parsed input files. Rewritten whenever the
+           input folder or any of its profiles changes, so repeated runs skip the .csv parsing entirely.
+
+        .input_times: The input table's timestamps, as a sorted int64 array (one entry per input row).
+
+        .input_values: The input table's Watts and VARs values as a float32 matrix of shape (DER inputs x time). It is
+           stored column-major, so the values for a single timestep are contiguous.
 
-        .list_of_ders: The DER names read from the header of the input table.
+        .input_cursor: Index into input_times of the next input row not yet used. Advances monotonically with the
+           simulation time, so each lookup is O(1) amortized. Only moved when a row is used for the current timestep
+           (see use_input_request()), never by reading ahead.
+
+        .list_of_ders: The DER names read from the header of the input table, in the same order as the rows of
+           input_values.
 
         .location_lookup_dictionary: A dictionary associating the DER unique identifiers with the bus they should
            be assigned to.
@@ -752,10 +1500,13 @@ class DERSHistoricalDataInput:
     def __init__(self, mcConfiguration):
 
         self.historical_data_file_path = mcConfiguration.mc_file_directory + r"/DERSHistoricalData_Inputs/"
+        self.historical_data_cache_file = mcConfiguration.mc_file_directory + r"/DERSHistoricalData_Cache/ders_profiles.npz"
         self.location_lookup_dictionary = {}
         self.new_values_inserted = False
         self.der_em_input_request = []
-        self.input_table = None
+        self.input_times = np.empty(0, dtype=np.int64)
+        self.input_values = np.empty((0, 0), dtype=np.float32)
+        self.input_cursor = 0
         self.list_of_ders = []
         self.ders_watts = {}
         self.ders_vars = {}
@@ -772,15 +1523,36 @@ class DERSHistoricalDataInput:
         self.read_input_file()
     
     # @profile
-    def get_input_request(self):
+    def get_input_request(self, sim_time=None):
         
         """
         This function (with this specific name) is required in each DER-S used by the ME. Accessor function that calls
         for an updated input request, then returns the updated request for use by the MCInputInterface
+
+        sim_time is the simulation time the request is for; the current simulation time if None. (The
+        MCInputInterface reads the next timestep's request ahead of time; see prefetch_der_s_input_requests().)
+        Reading a request for a given sim_time has no side effects: the input row is only marked as used, and
+        new_values_inserted set, once the MCInputInterface uses the request for the current timestep (see
+        use_input_request()).
         """
-        self.update_der_em_input_request()
+        self.update_der_em_input_request(sim_time=sim_time)
         return self.ders_watts, self.ders_vars
 
+    # @profile
+    def use_input_request(self, sim_time):
+        """
+        Optional DER-S method (see DERSRegistry). Called by the MCInputInterface once the input request for sim_time
+        is used for the current timestep: moves the cursor past the input row it held and sets new_values_inserted.
+        """
+        row_index = self.get_input_row(int(sim_time))
+        if row_index is not None:
+            self.use_input_row(row_index)
+
+    # @profile
+    def use_input_row(self, row_index):
+        self.input_cursor = row_index + 1
+        self.new_values_inserted = True
+
     def assign_der_s_to_der_em(self):
         """
         This function (with this specific name) is required in each DER-S used by the ME. The DERAssignmentHandler
@@ -788,68 +1560,143 @@ class DERSHistoricalDataInput:
         from each "DER input" for a given DER-S and "associate" them with the mRIDs for DER-EMs in the model. This is
         done using locational data: I.E. a specific DER input should be associated with the mRID of a DER-EM on a given
         bus.
-        """
 
+        Each DER is assigned one DER-EM: its "<DER>_Watts" and "<DER>_VARs" inputs are both associated with it.
+        """
+        der_inputs = {}
+        der_s_manifest = {}
         for loads in self.list_of_ders:
-            der_being_assigned = {}
-            der_being_assigned[loads] = self.input_table[0][(self.location_lookup_dictionary[loads])] # returns ders' bus
-            der_being_assigned[loads] = derAssignmentHandler.get_mRID_for_der_on_bus(Bus=der_being_assigned[loads])
-            assigned_der = dict([(value, key) for value, key in der_being_assigned.items()])
-            derAssignmentHandler.append_new_values_to_association_table(values = assigned_der)
+            der_id = loads.rsplit('_', 1)[0]
+            der_inputs.setdefault(der_id, []).append(loads)
+            der_s_manifest.setdefault(der_id, self.location_lookup_dictionary[loads])  # returns ders' bus
+
+        association_table, _ = derAssignmentHandler.assign_der_s_manifest(der_s_manifest)
+        for der_id, der_mrid in association_table.items():
+            assigned_der = {loads: der_mrid for loads in der_inputs[der_id]}
+            derAssignmentHandler.append_new_values_to_association_table(values=assigned_der)
         
     # @profile
     def open_input_file(self):
         """
-        Opens the historical data input file, read it as a .csv file, and parses it into a list of dicts.
+        Opens the historical data input files and parses them into a single columnar table. Returns the sorted
+        timestamps, the DER input names, the (DER inputs x time) value matrix and the bus location of each DER input.
         """
 
         """
         Update:
         The new method is the same as the old one. However, since we have 960 DERs in the feeder, and each DER has its own, dedicated Watts profile,
-        we perform the following steps to parse each profile into a list of dictionaries:
+        we perform the following steps to parse each profile into the columnar table:
 
             - Only read the profiles within the DERSHistoricalDataInput that start with the word (ders)
             - Sort the DERs profiles based on their order (from 1 - 960).
-            - Append the bus, the DER magnitude, and Time to the dicionary (x). <-- same as the previous version of this function!
+            - If the consolidated cache matches the current profiles, load it and skip the .csv files entirely.
+            - Otherwise, read all the profiles in parallel and assemble them in one allocation (see assemble_input_table()),
+              then rewrite the cache.
+        """
+        profile_filenames = self.get_profile_filenames()
+        cache_key = self.get_profile_cache_key(profile_filenames)
+        input_table = self.load_profile_cache(cache_key)
+        if input_table is None:
+            with ThreadPoolExecutor() as pool:
+                profiles = list(pool.map(pd.read_csv, [self.historical_data_file_path + file
+                                                       for file in profile_filenames]))
+            input_table = self.assemble_input_table(profiles)
+            self.write_profile_cache(cache_key, input_table)
+        return input_table
+
+    def get_profile_filenames(self):
+        """
+        Returns the DER profile filenames (ders_<number>.csv) in the input folder, sorted by DER number.
+        """
+        profile_filenames = [file for file in os.listdir(self.historical_data_file_path)
+                             if file.startswith('ders') and file.endswith('.csv')]
+        return sorted(profile_filenames, key=lambda file: int(re.sub(r'\D', '', file) or 0))
+
+    def get_profile_cache_key(self, profile_filenames):
+        """
+        The cache is keyed by the input folder's mtime. Editing a profile in place does not change the folder's mtime,
+        so the newest profile mtime and the number of profiles are part of the key as well.
+        """
+        folder_mtime = os.stat(self.historical_data_file_path).st_mtime_ns
+        newest_profile_mtime = max((os.stat(self.historical_data_file_path + file).st_mtime_ns
+                                    for file in profile_filenames), default=0)
+        return f"{folder_mtime}_{newest_profile_mtime}_{len(profile_filenames)}"
+
+    def assemble_input_table(self, profiles):
+        """
+        Assembles the parsed profiles into the columnar input table. The value matrix is allocated once and filled
+        one DER input at a time. As before, every profile shares the timestamps of the first one, missing values
+        are read as 0, and each "<DER>_Watts" and "<DER>_VARs" column is located on the bus given in the first row of
+        its "<DER>_loc" column.
+        """
+        input_times = profiles[0]['Time'].to_numpy(dtype=np.int64)
+        list_of_ders = []
+        value_columns = []
+        location_lookup_dictionary = {}
+        for df in profiles:
+            for key in df.columns:
+                if key.endswith('Watts'):
+                    der_loc = key.replace('_Watts', '_loc')
+                if key.endswith('Watts') or 'VARs' in key:
+                    list_of_ders.append(key)
+                    value_columns.append(df[key].to_numpy(dtype=np.float32))
+                    location_lookup_dictionary[key] = df[der_loc].iloc[0]
+
+        input_values = np.zeros((len(list_of_ders), len(input_times)), dtype=np.float32, order='F')
+        for i, values in enumerate(value_columns):
+            values = values[:len(input_times)]
+            input_values[i, :len(values)] = np.nan_to_num(values)
+
+        if np.any(np.diff(input_times) < 0):
+            time_order = np.argsort(input_times, kind='stable')
+            input_times = input_times[time_order]
+            input_values = np.asfortranarray(input_values[:, time_order])
+        return input_times, list_of_ders, input_values, location_lookup_dictionary
+
+    def load_profile_cache(self, cache_key):
+        """
+        Returns the input table stored in the cache file, or None if there is no cache or it is out of date.
         """
-        ders = [file for file in os.listdir(self.historical_data_file_path)]
-        df_all = pd.read_csv(self.historical_data_file_path+ders[0], usecols=['Time'])
-
-        for file in ders:
-            df = pd.read_csv(self.historical_data_file_path+file)
-            df = df.drop('Time', axis=1)
-            df_all = pd.concat([df_all, df], axis=1)
-        
-        df_all = df_all.fillna(0)        
-        return df_all.to_dict(orient='records')
-    
+        try:
+            with np.load(self.historical_data_cache_file) as cache:
+                if str(cache['cache_key']) != cache_key:
+                    return None
+                list_of_ders = cache['list_of_ders'].tolist()
+                location_lookup_dictionary = dict(zip(list_of_ders, cache['locations'].tolist()))
+                return (cache['input_times'], list_of_ders, np.asfortranarray(cache['input_values']),
+                        location_lookup_dictionary)
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def write_profile_cache(self, cache_key, input_table):
+        """
+        Writes the input table to the cache file. Written to a temporary file first, then renamed, so an interrupted
+        run can't leave a half-written cache behind.
+        """
+        input_times, list_of_ders, input_values, location_lookup_dictionary = input_table
+        os.makedirs(os.path.dirname(self.historical_data_cache_file), exist_ok=True)
+        temporary_cache_file = self.historical_data_cache_file + '.tmp'
+        with open(temporary_cache_file, 'wb') as f:
+            np.savez(f, cache_key=np.array(cache_key), input_times=input_times, input_values=input_values,
+                     list_of_ders=np.array(list_of_ders, dtype=str),
+                     locations=np.array([str(location_lookup_dictionary[der]) for der in list_of_ders], dtype=str))
+        os.replace(temporary_cache_file, self.historical_data_cache_file)
 
     def read_input_file(self):
 
         """
-        Reads and parses the input file. Places all the input information in input_table. Also, parses the
-        .csv file to determine the names and locations of each DER: when the timestamp column is removed, odd column
-        headers are names and even headers are their associated locations. These lists are converted to a list
-        of dictionaries to be passed to the assignment handler (which takes the locations for each DER name and assigns
-        a DER-EM mRID at the proper location to the name, this allows the MC to provide updated DER states to the DER-EM
-        without requiring the inputs to know DER-EM mRIDs.)
+        Reads and parses the input files into a columnar table: the timestamps go in input_times (sorted), and the Watts
+        and VARs columns go in the input_values matrix, one row per DER input. Also, gets the names and locations of
+        each DER input. These are placed in a dictionary to be passed to the assignment handler (which takes the
+        locations for each DER name and assigns a DER-EM mRID at the proper location to the name, this allows the MC
+        to provide updated DER states to the DER-EM without requiring the inputs to know DER-EM mRIDs.)
         """        
-        self.input_table = self.open_input_file()
-        first_row_time = self.input_table[0]['Time']
-        self.input_table[0].pop('Time')
-        for key in self.input_table[0].keys():
-            if key.endswith('Watts'):
-                der_name = key
-                der_loc = key.replace('_Watts','_loc')
-                self.location_lookup_dictionary[der_name] = der_loc
-            if 'VARs' in key:
-                imag = key
-                self.location_lookup_dictionary[imag] = der_loc
-        self.list_of_ders = list(self.location_lookup_dictionary.keys())
-        self.input_table[0]['Time'] = first_row_time
+        self.input_times, self.list_of_ders, self.input_values, self.location_lookup_dictionary = \
+            self.open_input_file()
+        self.input_cursor = 0
 
     # @profile
-    def update_der_em_input_request(self, force_first_row=False):
+    def update_der_em_input_request(self, force_first_row=False, sim_time=None):
         """
         Checks the current simulation time against the input table. If a new input exists for the current timestep,
         it is read, converted into an input dictionary, and put in the current der_input_request
@@ -859,89 +1706,342 @@ class DERSHistoricalDataInput:
 
             1- new_values_listed flag is used for Grid Services. Every time DER-EMs have new inputs, it means the grid
             states will be updated. Therefore, we need to check for a grid service.
+
+            2- Only the inputs for the current timestep are reported. Unchanged inputs are filtered out by the
+            MCInputInterface, which keeps track of what was last sent to each DER-EM.
+
+            3- The input table is read through input_cursor rather than searched. The cursor only moves forward (with a
+            binary search when the simulation time has passed it), so each timestep is O(1) amortized.
+
+            5- If the TickScheduler skipped timesteps, the latest input row at or before the current timestep is read
+            (see get_input_row()), so rows at the skipped timesteps are caught up on rather than lost.
+
+            4- sim_time can be given to read the input for a timestep other than the current one (the next one, when
+            the MCInputInterface reads ahead). The input is then only read: the cursor and new_values_inserted are
+            left as they are until the request is used (see use_input_request()). Without sim_time, the input for the
+            current timestep is read and used at once.
         """
         self.der_em_input_request.clear()
-        # print("STEPPING IN TO UPDATE_DER_EM_INPUT_REQUEST for DERHISTORICALDATAINPUT")
-        try:
-            if force_first_row is True:
-                # print("DERHistoricalDataInput TEST MODE: retrieving first item from input log")
-                input_at_time_now = next(item for item in self.input_table)
-            
-            else:
-                # print(edmCore.sim_current_time)
-                # print(next(item for item in self.input_table)['Time'])
-                input_at_time_now = next(item for item in self.input_table if int(edmCore.sim_current_time) <=
-                                         int(item['Time']) < (int(edmCore.sim_current_time) + 1))
+        self.ders_watts.clear()
+        self.ders_vars.clear()
+        if force_first_row is True:
+            # print("DERHistoricalDataInput TEST MODE: retrieving first item from input log")
+            row_index = 0
+            if row_index >= len(self.input_times):
+                return
             self.new_values_inserted = True
-            input_at_time_now = dict(input_at_time_now)
-            input_at_time_now.pop('Time')
-            for key, value in input_at_time_now.items():
-                if 'Watts' in key:
-                    self.optimize_der_ems_inputs(attribute=self.ders_watts, new_inputs_keys=key, new_inputs_values=value)
-                if 'VARs' in key:
-                    self.optimize_der_ems_inputs(attribute=self.ders_vars, new_inputs_keys=key, new_inputs_values=value)
+        else:
+            row_index = self.get_input_row(int(edmCore.sim_current_time if sim_time is None else sim_time))
+            if row_index is None:
+                return
+            if sim_time is None:
+                self.use_input_row(row_index)
+
+        input_at_time_now = zip(self.list_of_ders, self.input_values[:, row_index].tolist())
+        for key, value in input_at_time_now:
+            if 'Watts' in key:
+                self.ders_watts[key] = value
+            if 'VARs' in key:
+                self.ders_vars[key] = value
 
-        except StopIteration:
-            return 
 
     # @profile
-    def optimize_der_ems_inputs(self, attribute, new_inputs_keys, new_inputs_values):
+    def get_input_row(self, current_time):
         """
-        We iterate through the input table, extract the DER type loads and non-DER type loads, and put each type 
-        in its own der_em_input_request.
+        Returns the index of the latest input row at or before current_time that hasn't been read yet (I.E. at or after
+        input_cursor), or None if there is none. Normally that's the row at the cursor, if it's for current_time; if
+        timesteps were skipped, the rows before the latest one are superseded by it, since each row holds every
+        DER input.
         """
-        previous_inputs = attribute.get(new_inputs_keys)
-        if previous_inputs is None or previous_inputs != new_inputs_values:
-            attribute[new_inputs_keys] = new_inputs_values
-        else:
-            attribute.pop(new_inputs_keys)
+        cursor = self.input_cursor
+        if cursor >= len(self.input_times) or self.input_times[cursor] > current_time:
+            return None
+        if cursor + 1 >= len(self.input_times) or self.input_times[cursor + 1] > current_time:
+            return cursor
+        return int(np.searchsorted(self.input_times, current_time, side='right')) - 1
 
 
-class DERIdentificationManager:
+class DERSRegistry:
     """
-    This class manages the input association lookup table generated by the DERSAssignmentHandler. The accessor methods
-    allow input unique IDs to be looked up for a given DER-EM mRID, or vice versa. The table is generated during the
-    assignment process (see DERAssignmentHandler).
+    Holds the instantiated DER-S objects used in the simulation, in registration order, so the MC iterates over them
+    instead of looking up global object names with eval().
+
+    Every DER-S must implement the DER-S interface (see required_methods):
+        initialize_der_s(): called once during startup (see EDMCore.initialize_all_der_s()).
+        assign_der_s_to_der_em(): called once during DER-EM assignment (see DERAssignmentHandler.assign_all_ders()).
+        get_input_request(sim_time=None): returns the Watts and VARs input requests (and optionally a non-DER input
+            request) for sim_time. A DER-S whose get_input_request() takes no sim_time is always read for the current
+            timestep, and can't be read ahead (see MCInputInterface.prefetch_der_s_input_requests()). Only take
+            sim_time if the request is looked up by time and reading it has no side effects, since a request read
+            ahead for a timestep that the TickScheduler then skips is discarded.
+    and may implement the optional methods:
+        get_input_request_async(sim_time=None): starts reading the input request and returns a
+            concurrent.futures.Future of it, for DER-Ss that wait on I/O of their own.
+        use_input_request(sim_time): called once the input request for sim_time is used for the current timestep,
+            whether it was read ahead or not. Any state that reading a request would change (I.E. marking inputs as
+            sent) is changed here instead.
+
+    DER-S classes are found by name among the built-in DER-S classes, then among the installed entry points in the
+    entry_point_group group (so new DER-S types, I.E. PV or EV, can be added as separate packages), or given as a
+    'module:ClassName' import path. New DER-S objects are created with the MCConfiguration as their only argument.
 
     ATTRIBUTES:
-        .association_lookup_table: a list of dictionaries containing association data, read from the
-            DERAssignmentHandler after the startup process is complete. Used to connect the unique identifiers of
-            DER inputs (whatever form they might take) to mRIDs for their assigned DER-EMs.
+        .der_s_objects: The registered DER-S objects, by name, in registration order.
+
+        .der_s_accepts_sim_time: For each DER-S, whether its get_input_request() takes a sim_time argument.
+
+        .der_s_timings: For each DER-S, [number of calls, total seconds, maximum seconds] for each operation
+            ('initialize', 'assign' and 'get_input_request').
     """
+    required_methods = ('initialize_der_s', 'assign_der_s_to_der_em', 'get_input_request')
+    entry_point_group = 'model_controller.der_s'
+
     # @profile
     def __init__(self):
-        self.association_lookup_table = None
+        self.der_s_objects = {}
+        self.der_s_accepts_sim_time = {}
+        self.der_s_timings = {}
+        self.timing_lock = threading.Lock()
 
     # @profile
-    def get_meas_name(self, mrid):
-        """
+    def get_built_in_der_s_classes(self):
+        return {'DERSHistoricalDataInput': DERSHistoricalDataInput, 'RWHDERS': RWHDERS}
+
+    # @profile
+    def resolve_der_s_class(self, class_name):
+        """
+        Returns the DER-S class for class_name: a built-in DER-S class, a DER-S entry point, or a 'module:ClassName'
+        import path.
+        """
+        built_in_der_s_classes = self.get_built_in_der_s_classes()
+        if class_name in built_in_der_s_classes:
+            return built_in_der_s_classes[class_name]
+        for entry_point in importlib.metadata.entry_points(group=self.entry_point_group):
+            if entry_point.name == class_name:
+                return entry_point.load()
+        if ':' in class_name:
+            module_name, attribute_name = class_name.split(':', 1)
+            return getattr(importlib.import_module(module_name), attribute_name)
+        raise ValueError(f"Unknown DER-S class: {class_name}")
+
+    # @profile
+    def register(self, der_s_name, der_s_object):
+        """
+        Registers a DER-S object under der_s_name, after checking it implements the DER-S interface.
+        """
+        missing_methods = [method for method in self.required_methods
+                           if not callable(getattr(der_s_object, method, None))]
+        if missing_methods:
+            raise TypeError(f"DER-S {der_s_name} ({type(der_s_object).__name__}) is missing "
+                            f"{', '.join(missing_methods)}")
+        if der_s_name in self.der_s_objects:
+            raise ValueError(f"DER-S {der_s_name} is already registered")
+        self.der_s_objects[der_s_name] = der_s_object
+        self.der_s_accepts_sim_time[der_s_name] = \
+            'sim_time' in inspect.signature(der_s_object.get_input_request).parameters
+        self.der_s_timings[der_s_name] = {}
+
+    # @profile
+    def load_der_s_from_configuration(self, mcConfiguration, existing_der_s):
+        """
+        Registers the DER-Ss listed in MCConfiguration.ders_obj_list (and, if enabled, every DER-S entry point).
+        DER-Ss already instantiated by EDMCore.create_objects() are passed in existing_der_s by name and reused; the
+        rest are instantiated here.
+        """
+        for class_name, der_s_name in mcConfiguration.ders_obj_list.items():
+            if der_s_name in existing_der_s:
+                self.register(der_s_name, existing_der_s[der_s_name])
+            else:
+                self.register(der_s_name, self.resolve_der_s_class(class_name)(mcConfiguration))
+        if mcConfiguration.load_der_s_entry_points is True:
+            for entry_point in importlib.metadata.entry_points(group=self.entry_point_group):
+                if entry_point.name not in self.der_s_objects:
+                    self.register(entry_point.name, entry_point.load()(mcConfiguration))
+
+    # @profile
+    def get_all_der_s(self):
+        """
+        ACCESSOR: Returns (name, DER-S object) for every registered DER-S, in registration order.
+        """
+        return list(self.der_s_objects.items())
+
+    # @profile
+    def get_der_s_names(self):
+        return list(self.der_s_objects)
+
+    # @profile
+    def get_der_s(self, der_s_name):
+        return self.der_s_objects[der_s_name]
+
+    # @profile
+    def accepts_sim_time(self, der_s_name):
+        return self.der_s_accepts_sim_time[der_s_name]
+
+    # @profile
+    def has_async_input_request(self, der_s_name):
+        return callable(getattr(self.der_s_objects[der_s_name], 'get_input_request_async', None))
+
+    # @profile
+    def use_input_request(self, der_s_name, sim_time):
+        """
+        Tells the DER-S its input request for sim_time is being used, if it implements use_input_request().
+        """
+        use_input_request = getattr(self.der_s_objects[der_s_name], 'use_input_request', None)
+        if callable(use_input_request):
+            use_input_request(sim_time)
+
+    # @profile
+    def record_timing(self, der_s_name, operation, duration):
+        with self.timing_lock:
+            timing = self.der_s_timings[der_s_name].setdefault(operation, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += duration
+            timing[2] = max(timing[2], duration)
+
+    # @profile
+    def run_timed(self, der_s_name, operation, method, *args, **kwargs):
+        """
+        Calls a DER-S method, recording its duration under operation.
+        """
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self.record_timing(der_s_name, operation, time.perf_counter() - start)
+
+    # @profile
+    def get_input_request(self, der_s_name, sim_time):
+        """
+        Returns the DER-S's input request, for sim_time if its get_input_request() takes a sim_time argument.
+        """
+        der_s_object = self.der_s_objects[der_s_name]
+        if self.der_s_accepts_sim_time[der_s_name] is True:
+            return self.run_timed(der_s_name, 'get_input_request', der_s_object.get_input_request, sim_time=sim_time)
+        return self.run_timed(der_s_name, 'get_input_request', der_s_object.get_input_request)
+
+    # @profile
+    def get_input_request_async(self, der_s_name, sim_time):
+        """
+        Starts the DER-S's async input request and returns its future. The time until the request is ready is recorded
+        under 'get_input_request'.
+        """
+        start = time.perf_counter()
+        future = self.der_s_objects[der_s_name].get_input_request_async(sim_time=sim_time)
+        future.add_done_callback(
+            lambda future: self.record_timing(der_s_name, 'get_input_request', time.perf_counter() - start))
+        return future
+
+    # @profile
+    def get_timing_report(self):
+        """
+        Returns, for each DER-S and operation, the number of calls and the mean and maximum duration in seconds.
+        """
+        with self.timing_lock:
+            return {der_s_name: {operation: {'calls': count, 'mean': total / count, 'max': maximum}
+                                 for operation, (count, total, maximum) in timings.items()}
+                    for der_s_name, timings in self.der_s_timings.items()}
+
+
+class DERIdentificationManager:
+    """
+    This class manages the input association lookup table generated by the DERSAssignmentHandler. The accessor methods
+    allow input unique IDs to be looked up for a given DER-EM mRID, or vice versa. The table is generated during the
+    assignment process (see DERAssignmentHandler).
+
+    ATTRIBUTES:
+        .association_lookup_table: a list of dictionaries containing association data, read from the
+            DERAssignmentHandler after the startup process is complete. Used to connect the unique identifiers of
+            DER inputs (whatever form they might take) to mRIDs for their assigned DER-EMs.
+
+        .der_em_mrid_lookup_dict: input unique identifier -> DER-EM mRID. Built from the association lookup table once
+            (see initialize_association_lookup_table()), so each lookup is O(1).
+
+        .input_unique_id_lookup_dict: DER-EM mRID -> input unique identifier, the reverse of der_em_mrid_lookup_dict.
+
+        .unassigned_input_ids: The input unique identifiers associated with no DER-EM (None), because their bus ran
+            out of DER-EMs (see DERAssignmentHandler.oversubscribed_buses). They aren't dispatched.
+
+        .duplicate_input_ids: The input unique identifiers associated more than once, with every DER-EM mRID they were
+            associated with. The first association is the one used.
+
+        .shared_der_em_mrids: The DER-EM mRIDs associated with more than one input unique identifier by different
+            associations, with every input unique identifier associated with them. The last association is the one
+            reported by get_meas_name(). (The inputs of a single association, e.g. the Watts and VARs inputs of one DER,
+            are expected to share their DER-EM; the first of them is reported by get_meas_name().)
+    """
+    # @profile
+    def __init__(self):
+        self.association_lookup_table = None
+        self.der_em_mrid_lookup_dict = {}
+        self.input_unique_id_lookup_dict = {}
+        self.unassigned_input_ids = []
+        self.duplicate_input_ids = {}
+        self.shared_der_em_mrids = {}
+
+    # @profile
+    def get_meas_name(self, mrid):
+        """
         ACCESSOR FUNCTION: Returns a unique identifier for a given DER-EM mRID. If none found, the DER-EM was never
         assigned, and 'Unassigned' is returned instead.
         """
-        for i in self.association_lookup_table:
-            for key, value in i.items():
-                if value == mrid:
-                    input_unique_id = key
-        try:
-            return input_unique_id
-        except UnboundLocalError:
-            return 'Unassigned'
+        return self.input_unique_id_lookup_dict.get(mrid, 'Unassigned')
     
     # @profile
     def get_der_em_mrid(self, name):
         """
-        ACCESSOR FUNCTION: Returns the associated DER-EM control mRID for a given input unique identifier. Unlike
-        get_meas_name(), if none is found that signifies a critical error with the DERSAssignmentHandler.
+        ACCESSOR FUNCTION: Returns the associated DER-EM control mRID for a given input unique identifier, or None if
+        the input was left unassigned (see .unassigned_input_ids). Unlike get_meas_name(), if the input was never
+        associated at all that signifies a critical error with the DERSAssignmentHandler.
         """
-        x = next(d for i, d in enumerate(self.association_lookup_table) if name in d)
-        return x[name]
+        try:
+            return self.der_em_mrid_lookup_dict[name]
+        except KeyError:
+            raise KeyError(f"DER input {name} was never assigned to a DER-EM") from None
 
     # @profile
     def initialize_association_lookup_table(self):
         """
-        Retrieves the association table from the assignment handler.
+        Retrieves the association table from the assignment handler, and builds the lookup dictionaries in both
+        directions. Unassigned inputs, input unique identifiers associated more than once, and DER-EMs associated with
+        more than one input are reported (see .unassigned_input_ids, .duplicate_input_ids and .shared_der_em_mrids).
         """
         self.association_lookup_table = derAssignmentHandler.association_table
+        self.build_lookup_dictionaries()
+
+    # @profile
+    def build_lookup_dictionaries(self):
+        self.der_em_mrid_lookup_dict = {}
+        self.input_unique_id_lookup_dict = {}
+        self.unassigned_input_ids = []
+        self.duplicate_input_ids = {}
+        self.shared_der_em_mrids = {}
+        for association in self.association_lookup_table:
+            association_der_em_mrids = set()
+            for input_unique_id, der_em_mrid in association.items():
+                if input_unique_id in self.der_em_mrid_lookup_dict:
+                    self.duplicate_input_ids.setdefault(
+                        input_unique_id, [self.der_em_mrid_lookup_dict[input_unique_id]]).append(der_em_mrid)
+                else:
+                    self.der_em_mrid_lookup_dict[input_unique_id] = der_em_mrid
+                if der_em_mrid is None:
+                    self.unassigned_input_ids.append(input_unique_id)
+                    continue
+                if der_em_mrid in association_der_em_mrids:
+                    continue
+                association_der_em_mrids.add(der_em_mrid)
+                if der_em_mrid in self.input_unique_id_lookup_dict:
+                    self.shared_der_em_mrids.setdefault(
+                        der_em_mrid, [self.input_unique_id_lookup_dict[der_em_mrid]]).append(input_unique_id)
+                self.input_unique_id_lookup_dict[der_em_mrid] = input_unique_id
+        if self.unassigned_input_ids:
+            print(f"WARNING: {len(self.unassigned_input_ids)} DER inputs are not assigned to a DER-EM and will not be "
+                  f"dispatched: {self.unassigned_input_ids}")
+        if self.duplicate_input_ids:
+            print(f"WARNING: {len(self.duplicate_input_ids)} DER inputs are associated with more than one DER-EM; "
+                  f"the first association is used: {self.duplicate_input_ids}")
+        if self.shared_der_em_mrids:
+            print(f"WARNING: {len(self.shared_der_em_mrids)} DER-EMs are associated with more than one DER input: "
+                  f"{self.shared_der_em_mrids}")
 
 
 class DERAssignmentHandler:
@@ -956,12 +2056,24 @@ class DERAssignmentHandler:
     automatically looks up the appropriate mRID for the associated DER-EM and sends the inputs there.
 
     ATTRIBUTES:
-        .assignment_lookup_table: contains a list of dictionaries containing mRID, name, and Bus of each DER-EM within
-            the model.
+        .assignment_lookup_table: contains a list of dictionaries containing mRID, name, Bus, ratedS, ratedU and
+            phases of each DER-EM within the model, in query order.
 
-        .assignment_table: a redundant assignment_lookup_table, used during the assignment process in order to prevent
-            modification to the original assignment lookup table (which will still need to be used by the output
-            branch).
+        .der_ems_per_bus: Bus -> list of the DER-EMs on that bus (the same dictionaries as the assignment lookup
+            table), in query order. Every DER-EM on a bus is kept, so buses with several BatteryUnits can have several
+            DERs assigned to them.
+
+        .free_der_em_mrids: Bus -> deque of the mRIDs of the DER-EMs on that bus not yet assigned, built from
+            .der_ems_per_bus when the assignment process starts (see build_free_der_em_index()). Each assignment pops a
+            DER-EM off its bus's deque, so assignment is O(1) and a DER-EM can never be assigned twice. The assignment
+            lookup table itself is left unmodified, since it's still used by the output branch.
+
+        .der_em_count_per_bus: Bus -> the number of DER-EMs on that bus.
+
+        .oversubscribed_buses: Bus -> {'available': DER-EMs on the bus, 'requested': DERs located on the bus,
+            'unassigned': the unique identifiers of the DERs that couldn't be assigned} for each bus that more DERs were
+            located on than it has DER-EMs (including buses with no DER-EMs at all). Reported at the end of the
+            assignment process.
 
         .association_table: Contains association data provided by each DER-S class, for use by the
             DERIdentificationManager.
@@ -972,7 +2084,10 @@ class DERAssignmentHandler:
     # @profile
     def __init__(self):
         self.assignment_lookup_table = None
-        self.assignment_table = None
+        self.der_ems_per_bus = {}
+        self.free_der_em_mrids = {}
+        self.der_em_count_per_bus = {}
+        self.oversubscribed_buses = {}
         self.association_table = []
         self.der_em_mrid_per_bus_query_message = f'''
         PREFIX r:  <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
@@ -1013,80 +2128,109 @@ class DERAssignmentHandler:
         
         """
         Runs an extended SPARQL query on the database and parses it into the assignment lookup table: that is, the names
-        and mRIDs of all DER-EMs on each bus in the current model.
+        and mRIDs of all DER-EMs on each bus in the current model. The query results are read from the model metadata
+        cache if it holds them for the same query (see ModelMetadataCache), and cached otherwise.
         """
-        der_em_mrid_per_bus_query_output = edmCore.gapps_session.query_data(self.der_em_mrid_per_bus_query_message)
-        self.ders_assignment_lookup_table = self.iterate_over_queryy_response_info(query_response=der_em_mrid_per_bus_query_output,
-                                               name = 'DER_name',
-                                               mrid= 'DER_mRID',
-                                               merge_queries=False)
-        
-        self.assignment_lookup_table = self.iterate_over_queryy_response_info(query_response=der_em_mrid_per_bus_query_output,
-                                               name = 'DER_name',
-                                               mrid= 'DER_mRID',
-                                               merge_queries=True)
-    # @profile
-    def iterate_over_queryy_response_info(self, query_response, name, mrid, merge_queries):
-        if merge_queries == False:
-            self.merged_loads = {}
-
-        for i in range(len(query_response['data']['results']['bindings'])):
-            bus = query_response['data']['results']['bindings'][i]['bus']['value']
-            if bus not in self.merged_loads:
-                self.merged_loads[bus] = {}
-            
-            self.merged_loads[bus]['Bus'] = bus
-            self.merged_loads[bus][name] = query_response['data']['results']['bindings'][i]['name']['value']
-            self.merged_loads[bus][mrid] = query_response['data']['results']['bindings'][i]['id']['value']
-        
-        return list(self.merged_loads.values())
-    
+        cached_query = edmCore.model_metadata_cache.get('der_em_query') or {}
+        if cached_query.get('query') == self.der_em_mrid_per_bus_query_message:
+            der_em_mrid_per_bus_query_output = cached_query['response']
+        else:
+            der_em_mrid_per_bus_query_output = edmCore.gapps_session.query_data(self.der_em_mrid_per_bus_query_message)
+            edmCore.model_metadata_cache.set('der_em_query', {'query': self.der_em_mrid_per_bus_query_message,
+                                                              'response': der_em_mrid_per_bus_query_output})
+        self.ingest_der_em_query_response(der_em_mrid_per_bus_query_output)
+
+    # @profile
+    def ingest_der_em_query_response(self, query_response):
+        """
+        Parses the DER-EM query bindings into the assignment lookup table and the per-bus DER-EM lists, in a single pass
+        over the bindings. The rated values are converted to floats; DER-EMs without phase data have empty phases.
+        """
+        self.assignment_lookup_table = []
+        self.der_ems_per_bus = {}
+        for binding in query_response['data']['results']['bindings']:
+            bus = binding['bus']['value']
+            der_em = {'Bus': bus,
+                      'DER_name': binding['name']['value'],
+                      'DER_mRID': binding['id']['value'],
+                      'ratedS': float(binding['ratedS']['value']),
+                      'ratedU': float(binding['ratedU']['value']),
+                      'phases': binding.get('phases', {}).get('value', '')}
+            self.assignment_lookup_table.append(der_em)
+            self.der_ems_per_bus.setdefault(bus, []).append(der_em)
+
     # @profile
     def assign_all_ders(self):
 
         """
-        Calls the assignment process for each DER-S. Uses the DER-S list from MCConfiguration, so no additions are
-        needed here if new DER-Ss are added.
+        Calls the assignment process for each DER-S. Uses the DER-Ss in the DERSRegistry, so no additions are
+        needed here if new DER-Ss are added. Buses that more DERs were located on than they have DER-EMs are reported
+        once every DER-S is assigned; their extra DERs are left unassigned.
         """
+        self.build_free_der_em_index()
 
-        self.der_assignment_table = self.ders_assignment_lookup_table
+        for der_s_name, der_s_object in dersRegistry.get_all_der_s():
+            dersRegistry.run_timed(der_s_name, 'assign', der_s_object.assign_der_s_to_der_em)
 
+        if self.oversubscribed_buses:
+            print(f"WARNING: {len(self.oversubscribed_buses)} buses have more DERs than DER-EMs. "
+                  f"The bus may be wrong, or may not contain enough DER-EMs. Verify test. Unassigned DERs will not be "
+                  f"dispatched:")
+            for bus, report in self.oversubscribed_buses.items():
+                print(f"    {bus}: {report['requested']} DERs, {report['available']} DER-EMs. "
+                      f"Unassigned: {report['unassigned']}")
 
-        for key, value in mcConfiguration.ders_obj_list.items():
-            eval(value).assign_der_s_to_der_em()
+    # @profile
+    def build_free_der_em_index(self):
+        """
+        Builds the per-bus free lists of DER-EM mRIDs from the per-bus DER-EM lists, in query order, and clears any
+        previous assignment report.
+        """
+        self.free_der_em_mrids = {str(bus): deque(der_em['DER_mRID'] for der_em in der_ems)
+                                  for bus, der_ems in self.der_ems_per_bus.items()}
+        self.der_em_count_per_bus = {bus: len(mrids) for bus, mrids in self.free_der_em_mrids.items()}
+        self.oversubscribed_buses = {}
 
     # @profile
-    def get_mRID_for_der_on_bus(self, Bus):
+    def get_mRID_for_der_on_bus(self, Bus, der_id=None):
         """
         For a given Bus, checks if a DER-EM exists on that bus and is available for assignment. If so, returns its mRID
-        and removes it from the list (so a DER-EM can't be assigned twice).
-
-        The self.assignment_table variable contains the feeder information queries from blazegraph within 
-        the derassignmenthandler initialiation function
+        and removes it from the bus's free list (so a DER-EM can't be assigned twice). If not, the bus is recorded as
+        over-subscribed (see .oversubscribed_buses), with der_id as the unassigned DER, and None is returned.
         """
+        bus = str(Bus)
+        free_der_em_mrids = self.free_der_em_mrids.get(bus)
+        if free_der_em_mrids:
+            return free_der_em_mrids.popleft()
 
-        try:
-            next_mrid_on_bus = next(item for item in self.der_assignment_table if item['Bus'] == str(Bus))
-            der_mrid = next_mrid_on_bus['DER_mRID']
-            self.assignment_table = [i for i in self.der_assignment_table if not (i['DER_mRID'] == der_mrid)]
-            '''
-            self.assignment_table is updated with every iteration. The update process simply checks every bus, gets
-            its mRID, and removes it from the assignment_table. Basically what said above but good to see it in action.
-            At the end, the self.assignment_table will be empty.
-            '''
-
-        except StopIteration:
-            print("FATAL ERROR: Attempting to assign a DER to a nonexistent DER-EM. "
-                  "The bus may be wrong, or may not contain enough DER-EMs. Verify test.")
-            quit()
-        
-        
-        return der_mrid
+        available = self.der_em_count_per_bus.get(bus, 0)
+        report = self.oversubscribed_buses.setdefault(bus, {'available': available, 'requested': available,
+                                                            'unassigned': []})
+        report['requested'] += 1
+        report['unassigned'].append(der_id)
+        return None
+
+    # @profile
+    def assign_der_s_manifest(self, der_s_manifest):
+        """
+        Bulk assignment for a DER-S. der_s_manifest is a {DER unique identifier: bus} dictionary. Each DER is assigned
+        the next free DER-EM on its bus, in manifest order. Returns the association table for the manifest, a
+        {DER unique identifier: DER-EM mRID} dictionary of every DER in it (with None as the mRID of the DERs left
+        unassigned), and the over-subscription report (see .oversubscribed_buses) for the buses in the manifest that
+        ran out of DER-EMs.
+        """
+        association_table = {}
+        for der_id, bus in der_s_manifest.items():
+            association_table[der_id] = self.get_mRID_for_der_on_bus(bus, der_id)
+        oversubscribed_buses = {str(bus): self.oversubscribed_buses[str(bus)] for bus in set(der_s_manifest.values())
+                                if str(bus) in self.oversubscribed_buses}
+        return association_table, oversubscribed_buses
 
     # @profile
     def append_new_values_to_association_table(self, values):
         """
-        Used by DER-S classes to add new values to the association table during initialization.
+        Used by DER-S classes to add new values to the association table during initialization. DER inputs left
+        unassigned (see assign_der_s_manifest()) are added with None as their DER-EM mRID.
         """
         self.association_table.append(values)
 
@@ -1098,40 +2242,141 @@ class MCInputInterface:
     ATTRIBUTES:
         .current_unified_input_request: A list of all input requests currently being provided to the Input Interface
             by all active DER-Ss.
+
+        .current_watts_input_request, .current_vars_input_request, .current_non_der_input_request: This timestep's
+            inputs from all DER-Ss, keyed by input unique identifier, for the PowerElectronicsConnection.p,
+            PowerElectronicsConnection.q and EnergyConsumer.p control attributes respectively.
+
+        .last_sent_der_em_states: The last value sent to each DER-EM, keyed by (DER-EM mRID, control attribute). Used
+            to only send DER-EM inputs that actually changed (see get_der_em_changes()).
+
+        .der_s_read_pool: The worker threads reading the DER-S input requests concurrently.
+
+        .prefetch_pool: A single worker thread reading the next timestep's DER-S input requests in the background
+            (see prefetch_der_s_input_requests()).
+
+        .prefetched_input_requests: (simulation time, future of {DER-S name: input request}) for the input
+            requests being read ahead, or None.
     """
     
     # @profile
     def __init__(self):
         self.current_unified_input_request = []
         self.test_tpme1_unified_input_request = []
+        self.current_watts_input_request = {}
+        self.current_vars_input_request = {}
+        self.current_non_der_input_request = {}
+        self.last_sent_der_em_states = {}
+        self.der_s_read_pool = None
+        self.prefetch_pool = None
+        self.prefetched_input_requests = None
     
     # @profile
     def update_all_der_em_status(self):
         """
-        Currently, calls the update_der_ems() method. In the future, may be used to call methods for different input
-        types; a separate method may be written for voltage inputs, for instance, and called here once per timestep.
+        Sends this timestep's DER-EM inputs for every control attribute (see update_der_ems() for the attributes) in a
+        single difference message, so reactive power control doesn't cost an extra message per timestep. Messages are
+        only split if there are more changes than MCConfiguration.der_em_dispatch_max_message_size.
         """
-        self.update_der_ems(loads_dict=self.current_watts_input_request, control_attribute="PowerElectronicsConnection.p")
+        der_em_changes = self.get_der_em_changes(self.current_watts_input_request, "PowerElectronicsConnection.p")
+        der_em_changes += self.get_der_em_changes(self.current_vars_input_request, "PowerElectronicsConnection.q")
+        der_em_changes += self.get_der_em_changes(self.current_non_der_input_request, "EnergyConsumer.p")
+        self.send_der_em_changes(der_em_changes)
         
 
     # @profile
     def update_all_der_s_status(self):
         """
-        Gets the DER-S input requests.
+        Gets the DER-S input requests. When the on-timestep updates are pipelined, the next timestep's requests are
+        then read in the background, overlapping with this timestep's dispatch and logging.
         """
         self.get_all_der_s_input_requests()
+        if mcConfiguration.timestep_update_pipelining is True:
+            self.prefetch_der_s_input_requests(str(int(edmCore.sim_current_time) + 1))
 
     # @profile
-    def get_all_der_s_input_requests(self):
+    def read_der_s_input_requests(self, der_s_names, sim_time):
+        """
+        Reads the input requests of the given DER-Ss concurrently, so slow (I.E. file-backed) DER-Ss don't wait on
+        each other: DER-Ss with an async variant (see DERSRegistry) are started directly, and the rest are read on
+        the read pool. Returns {DER-S name: input request}.
         """
-        Retrieves input requests from all DER-Ss and appends them to a unified input request.
+        if len(der_s_names) == 1 and not dersRegistry.has_async_input_request(der_s_names[0]):
+            return {der_s_names[0]: dersRegistry.get_input_request(der_s_names[0], sim_time)}
+        futures = {}
+        for der_s_name in der_s_names:
+            if dersRegistry.has_async_input_request(der_s_name):
+                futures[der_s_name] = dersRegistry.get_input_request_async(der_s_name, sim_time)
+            else:
+                if self.der_s_read_pool is None:
+                    self.der_s_read_pool = ThreadPoolExecutor(max_workers=mcConfiguration.der_s_read_workers,
+                                                              thread_name_prefix='DERSRead')
+                futures[der_s_name] = self.der_s_read_pool.submit(dersRegistry.get_input_request, der_s_name,
+                                                                  sim_time)
+        return {der_s_name: future.result() for der_s_name, future in futures.items()}
 
+    # @profile
+    def prefetch_der_s_input_requests(self, sim_time):
         """
-        online_ders = mcConfiguration.ders_obj_list
-        
+        Starts reading the input requests for sim_time (the next timestep) in the background, for the DER-Ss that
+        can be read ahead (those whose get_input_request() takes a sim_time argument). They are collected by
+        get_all_der_s_input_requests(). The requests are copied as soon as they are read, since DER-Ss reuse their
+        request dictionaries.
+        """
+        if self.prefetch_pool is None:
+            self.prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='DERSPrefetch')
+
+        def read_ahead():
+            der_s_names = [der_s_name for der_s_name in dersRegistry.get_der_s_names()
+                           if dersRegistry.accepts_sim_time(der_s_name)]
+            return {der_s_name: tuple(dict(request) for request in der_s_input_request)
+                    for der_s_name, der_s_input_request in
+                    self.read_der_s_input_requests(der_s_names, sim_time).items()}
+
+        self.prefetched_input_requests = (sim_time, self.prefetch_pool.submit(read_ahead))
+
+    # @profile
+    def get_all_der_s_input_requests(self):
+        """
+        Retrieves input requests from all DER-Ss and merges them into one input request per control attribute. Each
+        DER-S's get_input_request() returns its Watts and VARs input requests, and may return a third request of
+        non-DER (EnergyConsumer) magnitudes.
+
+        UPDATE:
+            - The DER-Ss are read concurrently (see read_der_s_input_requests()). Requests read ahead for this timestep
+              (see prefetch_der_s_input_requests()) are used as they are; requests read ahead for another timestep
+              (I.E. after the TickScheduler skipped one) are discarded and read again. A read ahead is always finished
+              before any DER-S is read again, so a DER-S is never read by two threads at once. The requests are still
+              merged in DER-S registration (MCConfiguration.ders_obj_list) order.
+            - The DER-Ss are taken from the DERSRegistry rather than looked up by name with eval().
+            - Reading a request for a given time has no side effects, so a discarded read ahead changes nothing. Each
+              DER-S read for this timestep is then told its request is used (see DERSRegistry.use_input_request()).
+        """
+        sim_time = edmCore.sim_current_time
+        der_s_input_requests = {}
+        if self.prefetched_input_requests is not None:
+            prefetch_sim_time, prefetch_future = self.prefetched_input_requests
+            self.prefetched_input_requests = None
+            prefetched_input_requests = prefetch_future.result()
+            if prefetch_sim_time == sim_time:
+                der_s_input_requests = prefetched_input_requests
+        der_s_input_requests.update(self.read_der_s_input_requests(
+            [der_s_name for der_s_name in dersRegistry.get_der_s_names()
+             if der_s_name not in der_s_input_requests], sim_time))
+        for der_s_name in dersRegistry.get_der_s_names():
+            if dersRegistry.accepts_sim_time(der_s_name):
+                dersRegistry.use_input_request(der_s_name, sim_time)
+
         self.current_unified_input_request.clear()
-        for key, value in mcConfiguration.ders_obj_list.items():
-            self.current_watts_input_request, self.current_vars_input_request = eval(value).get_input_request()
+        self.current_watts_input_request = {}
+        self.current_vars_input_request = {}
+        self.current_non_der_input_request = {}
+        for der_s_name in dersRegistry.get_der_s_names():
+            der_s_input_request = der_s_input_requests[der_s_name]
+            self.current_watts_input_request.update(der_s_input_request[0])
+            self.current_vars_input_request.update(der_s_input_request[1])
+            if len(der_s_input_request) > 2:
+                self.current_non_der_input_request.update(der_s_input_request[2])
         # For TP-ME1-DER01:
         print(edmCore.sim_current_time)
         if edmCore.sim_current_time == "1570041120":
@@ -1163,22 +2408,52 @@ class MCInputInterface:
             Non-DER Magnitudes     |EnergyConsumer.p
         ---------------------------------------------------------
 
+        Only inputs that changed since they were last sent are delivered (see get_der_em_changes()), and nothing is
+        sent at all if no input changed.
         """
+        self.send_der_em_changes(self.get_der_em_changes(loads_dict, control_attribute))
 
-        input_topic = t.simulation_input_topic(edmCore.sim_mrid)
-        my_diff_build = DifferenceBuilder(edmCore.sim_mrid)
+    # @profile
+    def get_der_em_changes(self, loads_dict, control_attribute):
+        """
+        Looks up the DER-EM mRID for each input and compares the input against the value last sent to that DER-EM.
+        Returns a list of (DER-EM mRID, control attribute, new value, last sent value) for each input that has never
+        been sent, or that differs from the last sent value by more than the deadband set in MCConfiguration. Inputs
+        left unassigned on an over-subscribed bus (see DERIdentificationManager.unassigned_input_ids, reported during
+        startup) are skipped.
+        """
+        deadband = mcConfiguration.der_em_dispatch_deadband
+        der_em_changes = []
         for key, value in loads_dict.items():
-
             associated_der_em_mrid = derIdentificationManager.get_der_em_mrid(key)
+            if associated_der_em_mrid is None:
+                continue
+            value = int(value)
+            last_sent_value = self.last_sent_der_em_states.get((associated_der_em_mrid, control_attribute))
+            if last_sent_value is None or abs(value - last_sent_value) > deadband:
+                der_em_changes.append((associated_der_em_mrid, control_attribute, value, last_sent_value))
+        return der_em_changes
 
-            my_diff_build.add_difference(associated_der_em_mrid,
-                                         control_attribute,
-                                         int(value), 0)
-            
-        message = my_diff_build.get_message()
-        edmCore.gapps_session.send(input_topic, message)
-        my_diff_build.clear()
-        loads_dict.clear()
+    # @profile
+    def send_der_em_changes(self, der_em_changes):
+        """
+        Sends the DER-EM changes to the simulation as difference messages, each holding at most
+        MCConfiguration.der_em_dispatch_max_message_size changes, and records the sent values in the last-sent state
+        table. The reverse difference of each change is the value previously sent to the DER-EM.
+        """
+        input_topic = t.simulation_input_topic(edmCore.sim_mrid)
+        max_message_size = mcConfiguration.der_em_dispatch_max_message_size
+        my_diff_build = DifferenceBuilder(edmCore.sim_mrid)
+        for first_change in range(0, len(der_em_changes), max_message_size):
+            message_changes = der_em_changes[first_change:first_change + max_message_size]
+            for der_em_mrid, control_attribute, value, last_sent_value in message_changes:
+                my_diff_build.add_difference(der_em_mrid, control_attribute, value,
+                                             0 if last_sent_value is None else last_sent_value)
+            message = my_diff_build.get_message()
+            edmCore.gapps_session.send(input_topic, message)
+            my_diff_build.clear()
+            for der_em_mrid, control_attribute, value, last_sent_value in message_changes:
+                self.last_sent_der_em_states[(der_em_mrid, control_attribute)] = value
 
 
 class GOTopologyProcessor:
@@ -1207,67 +2482,135 @@ class GOTopologyProcessor:
 
         - The updated version of this class aligns with the older version objectives. It is however expanded to accommodate
         more complex topologies.
+
+        - The topology file is parsed once, during startup. The parsed tree and the lookup dictionaries below are
+        kept in memory, so the getters and ancestry queries never touch the xml file again.
+
+    ATTRIBUTES:
+        .topology_root: The root of the parsed topology tree (the substation).
+
+        .level_elements: The names of all elements at each topology level ('group', 'feeder', 'segment', 'xfmr',
+            'bus'), in file order.
+
+        .element_level_dict: The topology level of each element, by name.
+
+        .parent_lookup_dict: The name of each element's parent, by name.
+
+        .ancestor_lookup_dict: For each element, a dictionary of its ancestors' names by topology level (I.E. for a
+            bus: {'xfmr': ..., 'segment': ..., 'feeder': ..., 'group': ...}).
+
+        .bus_lookup_dict: For each element, the names of all buses under it.
     """
+    topology_levels = ('group', 'feeder', 'segment', 'xfmr', 'bus')
+
     # @profile
     def __init__(self):
         
         self.topology_file = './Configuration/psu_feeder_topology.xml'
+        self.topology_root = None
+        self.level_elements = {}
+        self.element_level_dict = {}
+        self.parent_lookup_dict = {}
+        self.ancestor_lookup_dict = {}
+        self.bus_lookup_dict = {}
 
     # @profile
     def import_topology_from_file(self):
         """
-        Read topology file
+        Reads the topology file and builds the lookup dictionaries. Called once during startup; call it again only
+        if the topology file changes.
         """
         tree = ET.parse(self.topology_file)
         root = tree.getroot()
 
+        self.topology_root = root
+        self.level_elements = {level: [] for level in self.topology_levels}
+        self.element_level_dict = {}
+        self.parent_lookup_dict = {}
+        self.ancestor_lookup_dict = {}
+        self.bus_lookup_dict = {}
+        self.index_topology_element(root, {})
+
         return root
+
+    # @profile
+    def index_topology_element(self, element, ancestors):
+        """
+        Walks the topology tree, adding each element below the given element to the lookup dictionaries. Returns the
+        buses under the element.
+        """
+        buses = []
+        for child in element:
+            name = child.get('name')
+            self.level_elements.setdefault(child.tag, []).append(name)
+            self.element_level_dict[name] = child.tag
+            self.parent_lookup_dict[name] = element.get('name', element.tag)
+            self.ancestor_lookup_dict[name] = ancestors
+            child_buses = self.index_topology_element(child, {**ancestors, child.tag: name})
+            if child.tag == 'bus':
+                child_buses = [name]
+            self.bus_lookup_dict[name] = child_buses
+            buses.extend(child_buses)
+        return buses
+
+    # @profile
+    def get_topology_root(self):
+        """
+        Returns the parsed topology tree, parsing the topology file first if that has not been done yet.
+        """
+        if self.topology_root is None:
+            self.import_topology_from_file()
+        return self.topology_root
+
     # @profile
     def get_substation(self):
         """
         Get the root name
         """
-        return self.import_topology_from_file().tag
+        return self.get_topology_root().tag
 
     # @profile
     def get_groups (self):
         """
         Get groups in root
         """
-        group = self.get_elements(self.import_topology_from_file(), 'group', 'name')
-        return group
+        return self.get_level_elements('group')
 
     # @profile
     def get_feeders (self):
         """
         Get feeder in each group
         """
-        feeders = self.get_elements(self.import_topology_from_file(), 'feeder', 'name')
-        return feeders
+        return self.get_level_elements('feeder')
 
     # @profile
     def get_segments (self):
         """
         Get segments in each feeder
         """
-        segments = self.get_elements(self.import_topology_from_file(), 'segment', 'name')
-        return segments
+        return self.get_level_elements('segment')
 
     # @profile
     def get_xfmrs (self):
         """
         Get transformers in each segment
         """
-        xfmrs = self.get_elements(self.import_topology_from_file(), 'xfmr', 'name')
-        return xfmrs
+        return self.get_level_elements('xfmr')
     
     # @profile
     def get_buses (self):
         """
         Get buses in each segment for each DER
         """
-        buses = self.get_elements(self.import_topology_from_file(), 'bus', 'name')
-        return buses
+        return self.get_level_elements('bus')
+
+    # @profile
+    def get_level_elements (self, level):
+        """
+        Returns (a copy of) the names of all elements at the given topology level.
+        """
+        self.get_topology_root()
+        return list(self.level_elements.get(level, []))
 
     # @profile
     def get_elements (self, element, tag, attribute):
@@ -1280,6 +2623,163 @@ class GOTopologyProcessor:
             attributes.append(elem.get(attribute))
         return attributes
 
+    # @profile
+    def get_element_level (self, name):
+        """
+        Returns the topology level of the named element (I.E. 'bus'), or None if it is not in the topology.
+        """
+        return self.element_level_dict.get(name)
+
+    # @profile
+    def get_parent (self, name):
+        """
+        Returns the name of the named element's parent (the substation for groups).
+        """
+        return self.parent_lookup_dict[name]
+
+    # @profile
+    def get_ancestor (self, name, level):
+        """
+        Returns the name of the element at the given topology level that contains the named element, I.E.
+        get_ancestor('tlx_652_a_h_3', 'group') returns 'group-1'. Returns None if there is none.
+        """
+        return self.ancestor_lookup_dict[name].get(level)
+
+    # @profile
+    def get_buses_under (self, name):
+        """
+        Returns the names of all buses under the named element (for a bus, the bus itself).
+        """
+        return self.bus_lookup_dict[name]
+
+
+class GOAggregationEngine:
+    """
+    Aggregates each measurement frame over the GO topology (see GOTopologyProcessor), for GOSensor's automatic mode.
+    The mapping from measurement mRIDs to topology buses is worked out once, from the measurement enrichment index;
+    after that, each frame is gathered into NumPy arrays and reduced per topology level (bus, xfmr, segment, feeder,
+    group) with vectorized group-by sums, rather than checking each measurement in turn.
+
+    Voltage (PNV) measurements are checked against the voltage band. Power (VA) measurements are converted to real
+    and reactive power and totalled per topology element; transformer loading is the apparent power total of each
+    transformer over its rating.
+
+    ATTRIBUTES:
+        .level_names: The element names at each topology level. Element i of a level is at index i of that level's
+            result arrays.
+
+        .bus_level_index: For each topology level, an array giving the index of the element containing each bus.
+
+        .pnv_mrids, .pnv_bus_index: The PNV measurement mRIDs located on topology buses, and the index of each one's bus.
+
+        .va_mrids, .va_bus_index: The same for VA measurements.
+
+        .bus_voltages: The magnitude of each PNV measurement in the latest frame (NaN if missing).
+
+        .voltage_violation_counts: For each topology level, the number of PNV measurements outside the voltage band
+            under each element in the latest frame.
+
+        .real_power_totals, .reactive_power_totals, .apparent_power_totals: For each topology level, the power totals
+            under each element in the latest frame.
+
+        .xfmr_loading: The latest apparent power total of each transformer, as a fraction of its rating.
+    """
+    topology_levels = ('bus',) + GOTopologyProcessor.topology_levels[-2::-1]
+
+    # @profile
+    def __init__(self, topology_processor, measurement_enrichment_index):
+        self.level_names = {level: topology_processor.get_level_elements(level) for level in self.topology_levels}
+        bus_positions = {bus: i for i, bus in enumerate(self.level_names['bus'])}
+        self.bus_level_index = {}
+        for level in self.topology_levels:
+            level_positions = {name: i for i, name in enumerate(self.level_names[level])}
+            if level == 'bus':
+                level_positions_per_bus = range(len(self.level_names['bus']))
+            else:
+                level_positions_per_bus = [level_positions[topology_processor.get_ancestor(bus, level)]
+                                           for bus in self.level_names['bus']]
+            self.bus_level_index[level] = np.array(level_positions_per_bus, dtype=np.intp)
+
+        self.pnv_mrids = []
+        self.va_mrids = []
+        pnv_bus_index = []
+        va_bus_index = []
+        for mrid, record in measurement_enrichment_index.items():
+            bus_position = bus_positions.get(record.get('Bus'))
+            if bus_position is None:
+                continue
+            if record.get('MeasType') == 'PNV':
+                self.pnv_mrids.append(mrid)
+                pnv_bus_index.append(bus_position)
+            elif record.get('MeasType') == 'VA':
+                self.va_mrids.append(mrid)
+                va_bus_index.append(bus_position)
+        self.pnv_bus_index = np.array(pnv_bus_index, dtype=np.intp)
+        self.va_bus_index = np.array(va_bus_index, dtype=np.intp)
+
+        self.bus_voltages = np.full(len(self.pnv_mrids), np.nan)
+        self.voltage_violation_counts = {}
+        self.real_power_totals = {}
+        self.reactive_power_totals = {}
+        self.apparent_power_totals = {}
+        self.xfmr_loading = np.zeros(len(self.level_names['xfmr']))
+
+    # @profile
+    def gather_measurement_values(self, measurements, mrids, value_name):
+        """
+        Returns an array of the named value (I.E. 'magnitude') of each of the given measurements. Measurements missing
+        from the frame, or without the value, are NaN.
+        """
+        missing = {}
+        return np.fromiter((measurements.get(mrid, missing).get(value_name, np.nan) for mrid in mrids),
+                           dtype=np.float64, count=len(mrids))
+
+    # @profile
+    def sum_per_level(self, bus_index, values):
+        """
+        Sums the values (one per measurement, located on the buses given by bus_index) under each element of each
+        topology level. Returns a dictionary of result arrays by level.
+        """
+        bus_totals = np.bincount(bus_index, weights=values, minlength=len(self.level_names['bus']))
+        totals = {}
+        for level in self.topology_levels:
+            totals[level] = np.bincount(self.bus_level_index[level], weights=bus_totals,
+                                        minlength=len(self.level_names[level]))
+        return totals
+
+    # @profile
+    def update(self, measurements, min_voltage, max_voltage, xfmr_rated_power):
+        """
+        Aggregates a measurement frame (see EDMMeasurementProcessor.get_current_measurements()): counts the voltage
+        band violations and totals the power under every topology element, and computes the transformer loading.
+        """
+        self.bus_voltages = self.gather_measurement_values(measurements, self.pnv_mrids, 'magnitude')
+        with np.errstate(invalid='ignore'):
+            violations = (self.bus_voltages < min_voltage) | (self.bus_voltages > max_voltage)
+        self.voltage_violation_counts = self.sum_per_level(self.pnv_bus_index, violations.astype(np.float64))
+
+        apparent_power = np.nan_to_num(self.gather_measurement_values(measurements, self.va_mrids, 'magnitude'))
+        angle = np.radians(np.nan_to_num(self.gather_measurement_values(measurements, self.va_mrids, 'angle')))
+        self.real_power_totals = self.sum_per_level(self.va_bus_index, apparent_power * np.cos(angle))
+        self.reactive_power_totals = self.sum_per_level(self.va_bus_index, apparent_power * np.sin(angle))
+        self.apparent_power_totals = {level: np.hypot(self.real_power_totals[level], self.reactive_power_totals[level])
+                                      for level in self.topology_levels}
+        self.xfmr_loading = self.apparent_power_totals['xfmr'] / xfmr_rated_power
+
+    # @profile
+    def get_buses_outside_voltage_band(self):
+        """
+        Returns the names of the buses with at least one voltage band violation in the latest frame.
+        """
+        return [self.level_names['bus'][i] for i in np.flatnonzero(self.voltage_violation_counts['bus'])]
+
+    # @profile
+    def get_overloaded_xfmrs(self):
+        """
+        Returns the names of the transformers loaded above their rating in the latest frame.
+        """
+        return [self.level_names['xfmr'][i] for i in np.flatnonzero(self.xfmr_loading > 1)]
+
 
 class GOSensor:
     """
@@ -1303,6 +2803,25 @@ class GOSensor:
 
         .manual_service_xml_data: In Manual Mode, the data contained within the manual service xml file. To be parsed
             and posted service objects generated from this data.
+
+        .manual_service_schedule: In Manual Mode, a min-heap of (start time, sequence number, service name, service
+            data) for each service not yet posted, so each timestep only pops the services that are due.
+
+        .scheduled_service_names: The names of all services ever scheduled, so reloading the manual service file
+            only adds new services.
+
+        .manual_service_file_mtime: The mtime of the manual service file when it was last loaded.
+
+        .manual_service_file_error_mtime: The mtime of the manual service file when it last failed to reload, so a
+            broken file is only reported (and retried) once per modification.
+
+        .voltage_support_buses: In Automatic Mode, the monitored buses with a detected voltage drop, each listed once
+            in the order they were detected. Cleared when the grid service type is set.
+
+        .go_aggregation_engine: In Automatic Mode, aggregates each measurement frame over the topology (see
+            GOAggregationEngine). Created on the first automatic decision.
+
+        .xfmr_rated_power: In Automatic Mode, the rated apparent power (VA) of the service transformers.
     
     """
 
@@ -1314,10 +2833,17 @@ class GOSensor:
         self.manual_service_xml_data = {}
         self.voltage_support_buses = []
         self.posted_service_list = []
+        self.manual_service_schedule = []
+        self.manual_service_sequence = itertools.count()
+        self.scheduled_service_names = set()
+        self.manual_service_file_mtime = None
+        self.manual_service_file_error_mtime = None
 
         # Set Feeder Parameters
 
         self.voltage_tolerance = 0.01     # 5% is the voltage tolerance as per ANSI C84.1
+        self.xfmr_rated_power = 40000     # The PSU feeder's service transformers are rated 40 kVA
+        self.go_aggregation_engine = None
         
         # Set the external inverter files
 
@@ -1339,10 +2865,13 @@ class GOSensor:
         if mcConfiguration.go_sensor_decision_making_manual_override is True:
             self.manually_post_service(edmTimekeeper.get_sim_current_time())
         elif mcConfiguration.go_sensor_decision_making_manual_override is False:
-            pass
-            # self.bus_list = self.setup_feeder_analysis_level()
-            # self.set_volt_var_thresholds()
-            # self.update_sensor_states()
+            if self.go_aggregation_engine is None:
+                self.bus_list = self.setup_feeder_analysis_level()
+                self.set_volt_var_thresholds()
+                self.go_aggregation_engine = GOAggregationEngine(goTopologyProcessor,
+                                                                 edmCore.get_measurement_enrichment_index())
+            self.update_sensor_states()
+            self.detect_grid_service_type()
         else:
             print("Service request failure. Wrong input.")
     
@@ -1389,36 +2918,43 @@ class GOSensor:
 
     # @profile
     def update_sensor_states(self):
-        pass
+        """
+        AUTOMATIC MODE: reads the current measurements, and aggregates them over the topology.
+        """
+        self.current_sensor_states = edmMeasurementProcessor.get_current_measurements()
+        if self.current_sensor_states:
+            self.go_aggregation_engine.update(self.current_sensor_states, self.min_threshold, self.max_threshold,
+                                              self.xfmr_rated_power)
     
     # @profile
-    def detect_grid_service_type (self, value):
+    def detect_grid_service_type (self):
         """
-        Parse the measurements per timestep. If a voltage drop is detected or transformers are overloaded, 
-        other functions are called to respond to the detected drops. Services are posted only once unless
-        a new input value is inserted to the simulation.
+        Checks the aggregated measurements (see update_sensor_states()) each timestep. If a voltage drop is detected
+        on any of the monitored buses or transformers are overloaded, other functions are called to respond to the
+        detected drops. Services are posted only once unless a new input value is inserted to the simulation.
         
         NOTE: Once a service is needed, it is directly posted to DERMS. Voltage support, however, is an exception.
         All functions related to voltage service are outlined in initialize_volt_var_support_service() function.
         """
-    
-        # if (value.get('MeasType') == "PNV" and
-        #     value.get('Bus') in self.bus_list and
-        #     dersHistoricalDataInput.new_values_inserted is True and 
-        #     (self.min_threshold > value.get('magnitude', float('inf')) or value.get('magnitude', float('-inf')) > self.max_threshold)
-        #     ):
-        if (value.get('MeasType') == "PNV" and
-            value.get('Bus') in self.bus_list and
-            dersHistoricalDataInput.new_values_inserted is True):
-            
-            # print(self.min_threshold,'\t',value.get('magnitude', float('inf')))
-
-            if self.min_threshold > value.get('magnitude', float('inf')):
-                print("\n\n VOLTAGE DROP\n\n")
-                print('\n\nBus --> ',value.get('Bus'), 'magnitude --> ', value.get('magnitude'))
-                self.voltage_support_buses.append(value.get('Bus'))
-
-        # self.initialize_volt_var_support_service(bus=value.get('Bus'),magnitude=value.get('magnitude'))
+        if not self.current_sensor_states or dersHistoricalDataInput.new_values_inserted is not True:
+            return
+
+        engine = self.go_aggregation_engine
+        monitored_buses = set(self.bus_list)
+        low_voltage = engine.bus_voltages < self.min_threshold
+        low_voltage_buses = {engine.level_names['bus'][i] for i in engine.pnv_bus_index[low_voltage]}
+        low_voltage_buses &= monitored_buses
+        if low_voltage_buses:
+            print("\n\n VOLTAGE DROP\n\n")
+            print('\n\nBuses --> ', sorted(low_voltage_buses), 'minimum magnitude --> ',
+                  np.nanmin(engine.bus_voltages[low_voltage]))
+            self.voltage_support_buses.extend(sorted(low_voltage_buses - set(self.voltage_support_buses)))
+
+        overloaded_xfmrs = engine.get_overloaded_xfmrs()
+        if overloaded_xfmrs:
+            print('\n\nOverloaded transformers --> ', overloaded_xfmrs)
+
+        # self.initialize_volt_var_support_service(bus=..., magnitude=...)
        
     # @profile
     def initialize_volt_var_support_service (self, bus, magnitude):
@@ -1439,9 +2975,13 @@ class GOSensor:
 
     # @profile
     def set_grid_service_type (self, grid_service_type):
+        """
+        Sets the service type for the detected voltage support buses, and clears them for the next detection.
+        """
         self.service_type = grid_service_type
         # print(self.service_type)
         print(self.voltage_support_buses)
+        self.voltage_support_buses = []
         dersHistoricalDataInput.new_values_inserted = False
 
     # @profile
@@ -1449,34 +2989,89 @@ class GOSensor:
         
         """
         MANUAL MODE: Reads the manually_posted_service_input.xml file during MC initialization and loads it into
-        a dictionary for later use.
+        a dictionary for later use. Each service is added to the manual service schedule, keyed by its start time.
+        If the file is loaded again (see reload_manual_service_file_if_changed()), only services with new names are
+        added.
+
+        Every new service is parsed before any is scheduled, so a file with an invalid service (I.E. a non-integer
+        start_time) raises without changing the schedule.
         """
+        file_mtime = os.stat(mcConfiguration.manual_service_filename).st_mtime_ns
         input_file = open(mcConfiguration.manual_service_filename, "r")
         data = input_file.read()
         input_file.close()
-        self.manual_service_xml_data = xmltodict.parse(data)
+        manual_service_xml_data = xmltodict.parse(data)
+        services = manual_service_xml_data['services'] or {}
+        new_services = [self.parse_manual_service(key, item) for key, item in services.items()
+                        if str(key) not in self.scheduled_service_names]
+        self.manual_service_xml_data = manual_service_xml_data
+        for start_time, name, item in new_services:
+            self.push_manual_service(start_time, name, item)
+        self.manual_service_file_mtime = file_mtime
+
+    # @profile
+    def schedule_manual_service(self, name, item):
+        """
+        MANUAL MODE: Adds a service to the manual service schedule. item is a dictionary of the service's data, in the
+        same format as each service in the manual service file (start_time, group_id, service_type, etc.). Can be used
+        to add services during the simulation. Raises (without scheduling anything) if the service can't be parsed.
+        """
+        self.push_manual_service(*self.parse_manual_service(name, item))
+
+    # @profile
+    def parse_manual_service(self, name, item):
+        """
+        MANUAL MODE: Returns (start time, name, item) for a service, or raises KeyError, TypeError or ValueError if its
+        start_time is missing or not an integer.
+        """
+        return int(item['start_time']), str(name), item
+
+    # @profile
+    def push_manual_service(self, start_time, name, item):
+        self.scheduled_service_names.add(name)
+        heapq.heappush(self.manual_service_schedule, (start_time, next(self.manual_service_sequence), name, item))
+
+    # @profile
+    def reload_manual_service_file_if_changed(self):
+        """
+        MANUAL MODE: Reloads the manual service file if it was modified since it was last loaded, so services can be
+        added to it during the simulation. If the modified file can't be read or parsed (I.E. it's half-saved), the
+        current schedule is kept, a warning is printed once, and the file is tried again when it's next modified.
+        """
+        try:
+            file_mtime = os.stat(mcConfiguration.manual_service_filename).st_mtime_ns
+        except OSError:
+            return
+        if file_mtime == self.manual_service_file_mtime or file_mtime == self.manual_service_file_error_mtime:
+            return
+        try:
+            self.load_manual_service_file()
+        except (OSError, ExpatError, KeyError, TypeError, ValueError, AttributeError) as e:
+            self.manual_service_file_error_mtime = file_mtime
+            print(f"WARNING: Could not reload {mcConfiguration.manual_service_filename} ({e!r}). "
+                  f"Keeping the current manual service schedule.")
 
     # @profile
     def manually_post_service(self, sim_time):
         """
-        Called by make_service_request_decision() when in MANUAL mode. Reads the contents of the manual service
-        dictionary, draws all relevant data points for each service, and instantiates a GOPostedService object for each
-        one, appending the objects to a list.
-        """
-        for key, item in self.manual_service_xml_data['services'].items():
-            if int(item['start_time']) == int(sim_time):
-                name = str(key)
-                group_id = item["group_id"]
-                service_type = item["service_type"]
-                interval_duration = item["interval_duration"]
-                interval_start = item["interval_start"]
-                power = item["power"]
-                ramp = item["ramp"]
-                price = item["price"]
-                start_time = item["start_time"]
-                self.posted_service_list.append(GOPostedService(
-                    name, group_id, service_type, interval_start, interval_duration, power, ramp, price))
-                
+        Called by make_service_request_decision() when in MANUAL mode. Pops every service that is due from the manual
+        service schedule, draws all relevant data points for each service, and instantiates a GOPostedService object
+        for each one, appending the objects to a list. Services whose start time was skipped over are posted late
+        rather than dropped.
+        """
+        self.reload_manual_service_file_if_changed()
+        sim_time = int(sim_time)
+        while self.manual_service_schedule and self.manual_service_schedule[0][0] <= sim_time:
+            start_time, sequence, name, item = heapq.heappop(self.manual_service_schedule)
+            group_id = item.get("group_id", 0)
+            service_type = item.get("service_type", "Undefined")
+            interval_duration = item.get("interval_duration", 0)
+            interval_start = item.get("interval_start", 0)
+            power = item.get("power", 0)
+            ramp = item.get("ramp", 0)
+            price = item.get("price", 0)
+            self.posted_service_list.append(GOPostedService(
+                name, group_id, service_type, interval_start, interval_duration, power, ramp, price))
 
 
 class GOOutputInterface:
@@ -1487,8 +3082,21 @@ class GOOutputInterface:
     ATTRIBUTES:
         .current_service_requests: A list of posted services. These are the services that are being requested, or are
             currently being executed. Can come from either Automatic or Manual Decision making. See GOPostedService.
+
+        .service_message_fragments: The serialized xml of each service in current_service_requests. Each service is
+            serialized once, when it is posted.
+
+        .service_file_is_dirty: True if the set of services changed since the service file was last written.
+
+        .service_file_path: The xml file read by the GSP.
     """
-    current_service_requests = []
+
+    # @profile
+    def __init__(self):
+        self.current_service_requests = []
+        self.service_message_fragments = []
+        self.service_file_is_dirty = True
+        self.service_file_path = "Outputs To DERMS/OutputtoGSP.xml"
 
     # @profile
     def get_all_posted_service_requests(self):
@@ -1504,42 +3112,364 @@ class GOOutputInterface:
         for item in goSensor.posted_service_list:
             if item.get_status() is False:
                 print("Posting...")
-                self.current_service_requests.append(item.get_service_message_data())
+                self.add_service_request(item.get_service_message_data())
                 item.set_status(True)
             else:
                 print("----------------All already posted----------------")
+
+    # @profile
+    def add_service_request(self, service_message_data):
+        """
+        Appends a service to current_service_requests, serializes it, and flags the service file for rewriting.
+        """
+        self.current_service_requests.append(service_message_data)
+        service_serial_num = len(self.current_service_requests)
+        self.service_message_fragments.append('<service' + str(service_serial_num) + '>\n' +
+                                              dict2xml(service_message_data) + '\n' +
+                                              '</service' + str(service_serial_num) + '>\n')
+        self.service_file_is_dirty = True
                 
     # @profile
     def generate_service_messages(self):
         """
         Converts the current_service_requests list of dicts into a proper xml format. Used by the xml writed in
-        send_service_request_messages().
+        send_service_request_messages(). Each service's xml is cached when it is posted (see add_service_request()).
         """
-        request_out_xml = '<services>\n'
-        service_serial_num = 1
-        for item in self.current_service_requests:
-            request_out_xml = request_out_xml + '<service' + str(service_serial_num) + '>\n'
-            request_out_xml = request_out_xml + dict2xml(item) + '\n'
-            request_out_xml = request_out_xml + '</service' + str(service_serial_num) + '>\n'
-            service_serial_num = service_serial_num + 1
-        request_out_xml = request_out_xml + '</services>'
-        return request_out_xml
+        return '<services>\n' + ''.join(self.service_message_fragments) + '</services>'
 
     # @profile
     def send_service_request_messages(self):
         """
         Writes the current service request messages to an xml file, which will be accessed by the GSP for its service
-        provisioning functions.
+        provisioning functions. The file is only rewritten when the services changed. It is written to a temporary
+        file which then replaces the old one, so the GSP never reads a half-written file.
         """
-        xmlfile = open("Outputs To DERMS/OutputtoGSP.xml", "w")
+        if self.service_file_is_dirty is False:
+            return
+        temporary_file_path = self.service_file_path + ".tmp"
+        xmlfile = open(temporary_file_path, "w")
         xmlfile.write(self.generate_service_messages())
         xmlfile.close()
+        os.replace(temporary_file_path, self.service_file_path)
+        self.service_file_is_dirty = False
+
+
+class EpochTimestampFormatter:
+    """
+    Formats integer epoch seconds as 'YYYY-MM-DD HH:MM:SS' UTC strings, for logs and log readers. The date part is
+    formatted once per day and cached; the time of day is plain arithmetic. This replaces building, localizing and
+    formatting a pandas Timestamp for every row.
+
+    ATTRIBUTES:
+        .day_start: The epoch second at the start of the cached day.
+
+        .day_prefix: The formatted date of the cached day, I.E. '2019-10-02 '.
+    """
+    # @profile
+    def __init__(self):
+        self.day_start = None
+        self.day_prefix = ''
+
+    # @profile
+    def format(self, epoch_seconds):
+        epoch_seconds = int(epoch_seconds)
+        seconds_of_day = epoch_seconds % 86400
+        day_start = epoch_seconds - seconds_of_day
+        if day_start != self.day_start:
+            self.day_prefix = datetime.fromtimestamp(day_start, timezone.utc).strftime('%Y-%m-%d ')
+            self.day_start = day_start
+        hours, remainder = divmod(seconds_of_day, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        return f"{self.day_prefix}{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+class ColumnarMeasurementLogWriter:
+    """
+    Writes one columnar measurement log file (.npz). Unlike the .csv logs, which store each measurement's whole
+    dictionary as text in a cell, the log holds one row per (timestep, measurement) in typed columns:
+
+        timestamp (int64 epoch seconds), measurement (int32), magnitude (float32), angle (float32), value (float32)
+
+    The measurement column is a code into the measurement dictionary arrays, which are stored once per file:
+
+        measurement_mrid, measurement_name, conducting_equipment, bus, phases, meas_type, der_input_id
+
+    Missing values are NaN. Rows are buffered in memory and the file is written (compressed) when closed. It is
+    written to a temporary file which is then renamed, so a reader never sees a half-written log. Reading a log is
+    numpy.load(); filters are then vectorized, I.E. the PNV rows are
+    numpy.isin(log['measurement'], numpy.flatnonzero(log['meas_type'] == 'PNV')).
+
+    ATTRIBUTES:
+        .log_name: The log file being written.
+
+        .measurement_mrids: The mRIDs of the measurements logged, in measurement code order.
+
+        .measurement_dictionary: The measurement dictionary arrays, by name (see above).
+
+        .row_buffers: The buffered timestamp, magnitude, angle and value arrays, one array per timestep.
+    """
+    dictionary_fields = {
+        'measurement_name': 'Measurement name',
+        'conducting_equipment': 'Conducting Equipment Name',
+        'bus': 'Bus',
+        'phases': 'Phases',
+        'meas_type': 'MeasType',
+        'der_input_id': 'DER Input Unique ID'
+    }
+
+    # @profile
+    def __init__(self, log_name, measurement_mrids, measurement_enrichment_index, measurement_dictionary=None):
+        """
+        measurement_dictionary can be taken from the previous log segment's writer, when the measurements logged are
+        unchanged, to skip building it again.
+        """
+        self.log_name = log_name
+        self.measurement_mrids = list(measurement_mrids)
+        self.measurement_dictionary = measurement_dictionary
+        if self.measurement_dictionary is None:
+            self.measurement_dictionary = {'measurement_mrid': np.array(self.measurement_mrids, dtype=str)}
+            missing = {}
+            for field, record_key in self.dictionary_fields.items():
+                self.measurement_dictionary[field] = np.array(
+                    [str(measurement_enrichment_index.get(mrid, missing).get(record_key, ''))
+                     for mrid in self.measurement_mrids], dtype=str)
+        self.row_buffers = {'timestamp': [], 'magnitude': [], 'angle': [], 'value': []}
+        self.buffered_bytes = 0
+
+    # @profile
+    def gather_values(self, measurements, value_name):
+        """
+        Returns this timestep's value (I.E. 'magnitude') for each logged measurement, NaN where missing.
+        """
+        missing = {}
+        return np.fromiter((measurements.get(mrid, missing).get(value_name, np.nan)
+                            for mrid in self.measurement_mrids), dtype=np.float32, count=len(self.measurement_mrids))
+
+    # @profile
+    def write_row(self, timestamp, measurements):
+        """
+        Buffers one timestep of measurements.
+        """
+        self.row_buffers['timestamp'].append(np.full(len(self.measurement_mrids), timestamp, dtype=np.int64))
+        self.row_buffers['magnitude'].append(self.gather_values(measurements, 'magnitude'))
+        self.row_buffers['angle'].append(self.gather_values(measurements, 'angle'))
+        self.row_buffers['value'].append(self.gather_values(measurements, 'value'))
+        # timestamp (8) + measurement code (4) + magnitude, angle, value (4 each) bytes per measurement.
+        self.buffered_bytes += 24 * len(self.measurement_mrids)
+
+    # @profile
+    def get_buffered_bytes(self):
+        """
+        Returns the (uncompressed) size of the buffered rows, in bytes.
+        """
+        return self.buffered_bytes
+
+    # @profile
+    def close(self):
+        """
+        Writes the buffered rows and the measurement dictionary to the log file.
+        """
+        number_of_timesteps = len(self.row_buffers['timestamp'])
+        columns = {name: np.concatenate(arrays) if arrays else np.empty(0, dtype=np.float32)
+                   for name, arrays in self.row_buffers.items()}
+        columns['timestamp'] = columns['timestamp'].astype(np.int64)
+        columns['measurement'] = np.tile(np.arange(len(self.measurement_mrids), dtype=np.int32), number_of_timesteps)
+        temporary_log_name = self.log_name + '.tmp'
+        with open(temporary_log_name, 'wb') as log_file:
+            np.savez_compressed(log_file, **columns, **self.measurement_dictionary)
+        os.replace(temporary_log_name, self.log_name)
+
+
+class BackgroundLogWriter:
+    """
+    Runs log writes on a dedicated writer thread, so the timestep updates (which run on the GridAPPS-D callback thread)
+    only pay for putting an entry on a queue. The writer thread takes entries off the bounded queue in batches, passes
+    each one to write_function, then calls flush_function(False) after each batch and flush_function(True) (fsync)
+    every fsync_interval seconds.
+
+    When the queue is full, queue_full_policy decides what happens to a new entry: 'block' waits for room,
+    'drop_oldest' discards the oldest queued entry, and 'spill' pickles the new entry to spill_file_path; spilled
+    entries are written (in order) once the queue has been drained.
+
+    ATTRIBUTES:
+        .entry_queue: The bounded queue of entries waiting to be written.
+
+        .metrics: Counters for monitoring the writer: entries submitted, written, dropped and spilled, write errors,
+            the maximum queue depth, the total and maximum submit and write latencies (in seconds).
+    """
+    stop_sentinel = object()
+
+    # @profile
+    def __init__(self, write_function, flush_function, queue_size, queue_full_policy, batch_size, fsync_interval,
+                 spill_file_path):
+        if queue_full_policy not in ('block', 'drop_oldest', 'spill'):
+            raise ValueError(f"Unknown log queue full policy: {queue_full_policy}")
+        self.write_function = write_function
+        self.flush_function = flush_function
+        self.entry_queue = queue.Queue(maxsize=queue_size)
+        self.queue_full_policy = queue_full_policy
+        self.batch_size = batch_size
+        self.fsync_interval = fsync_interval
+        self.spill_file_path = spill_file_path
+        self.spill_file = None
+        self.spill_read_offset = 0
+        self.spilled_entries = 0
+        self.spill_lock = threading.Lock()
+        self.metrics = {'submitted': 0, 'written': 0, 'dropped': 0, 'spilled': 0, 'write_errors': 0,
+                        'max_queue_depth': 0, 'total_submit_latency': 0.0, 'max_submit_latency': 0.0,
+                        'total_write_latency': 0.0, 'max_write_latency': 0.0}
+        self.writer_thread = threading.Thread(target=self.run, name='MCOutputLogWriter', daemon=True)
+
+    # @profile
+    def start(self):
+        self.writer_thread.start()
+
+    # @profile
+    def submit(self, entry):
+        """
+        Queues an entry for writing, applying the queue full policy if needed.
+        """
+        start = time.perf_counter()
+        if self.queue_full_policy == 'block':
+            self.entry_queue.put(entry)
+        elif self.queue_full_policy == 'drop_oldest':
+            while True:
+                try:
+                    self.entry_queue.put_nowait(entry)
+                    break
+                except queue.Full:
+                    try:
+                        self.entry_queue.get_nowait()
+                        self.metrics['dropped'] += 1
+                    except queue.Empty:
+                        pass
+        else:
+            with self.spill_lock:
+                try:
+                    if self.spilled_entries > 0:
+                        raise queue.Full
+                    self.entry_queue.put_nowait(entry)
+                except queue.Full:
+                    self.spill_entry(entry)
+        submit_latency = time.perf_counter() - start
+        self.metrics['submitted'] += 1
+        self.metrics['max_queue_depth'] = max(self.metrics['max_queue_depth'], self.entry_queue.qsize())
+        self.metrics['total_submit_latency'] += submit_latency
+        self.metrics['max_submit_latency'] = max(self.metrics['max_submit_latency'], submit_latency)
+
+    # @profile
+    def spill_entry(self, entry):
+        """
+        Appends an entry to the spill file. Must be called with spill_lock held.
+        """
+        if self.spill_file is None:
+            self.spill_file = open(self.spill_file_path, 'w+b')
+        self.spill_file.seek(0, os.SEEK_END)
+        pickle.dump(entry, self.spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.spilled_entries += 1
+        self.metrics['spilled'] += 1
+
+    # @profile
+    def read_spilled_entries(self):
+        """
+        Returns up to batch_size entries from the spill file, oldest first. Once every spilled entry has been read,
+        the spill file is emptied and new entries go back on the queue.
+        """
+        spilled_entries = []
+        with self.spill_lock:
+            while self.spilled_entries > 0 and len(spilled_entries) < self.batch_size:
+                self.spill_file.seek(self.spill_read_offset)
+                spilled_entries.append(pickle.load(self.spill_file))
+                self.spill_read_offset = self.spill_file.tell()
+                self.spilled_entries -= 1
+            if self.spill_file is not None and self.spilled_entries == 0:
+                self.spill_file.truncate(0)
+                self.spill_read_offset = 0
+        return spilled_entries
+
+    # @profile
+    def get_batch(self):
+        """
+        Waits for the next entry (at most until the next fsync is due), then takes up to batch_size queued entries.
+        """
+        batch = []
+        try:
+            batch.append(self.entry_queue.get(timeout=0.01 if self.spilled_entries > 0 else self.fsync_interval))
+            while len(batch) < self.batch_size:
+                batch.append(self.entry_queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    # @profile
+    def write_entries(self, entries):
+        for entry in entries:
+            start = time.perf_counter()
+            try:
+                self.write_function(entry)
+                self.metrics['written'] += 1
+            except Exception as e:
+                self.metrics['write_errors'] += 1
+                print(f"Log writer error: {e!r}")
+            write_latency = time.perf_counter() - start
+            self.metrics['total_write_latency'] += write_latency
+            self.metrics['max_write_latency'] = max(self.metrics['max_write_latency'], write_latency)
+        if entries:
+            self.flush_function(False)
+
+    # @profile
+    def run(self):
+        """
+        The writer thread's main loop. Ends after the stop sentinel (see stop()) and any spilled entries are written.
+        """
+        last_fsync = time.monotonic()
+        stopping = False
+        while not stopping:
+            batch = self.get_batch()
+            if self.stop_sentinel in batch:
+                stopping = True
+                batch = batch[:batch.index(self.stop_sentinel)]
+            if not batch:
+                batch = self.read_spilled_entries()
+            self.write_entries(batch)
+            if time.monotonic() - last_fsync >= self.fsync_interval:
+                self.flush_function(True)
+                last_fsync = time.monotonic()
+
+        spilled_entries = self.read_spilled_entries()
+        while spilled_entries:
+            self.write_entries(spilled_entries)
+            spilled_entries = self.read_spilled_entries()
+        self.flush_function(True)
+
+    # @profile
+    def stop(self):
+        """
+        Waits for every submitted entry to be written, then stops the writer thread and removes the spill file.
+        """
+        self.entry_queue.put(self.stop_sentinel)
+        self.writer_thread.join()
+        if self.spill_file is not None:
+            self.spill_file.close()
+            os.remove(self.spill_file_path)
+
+    # @profile
+    def get_metrics(self):
+        """
+        Returns the writer metrics, including the current queue depth and the mean submit and write latencies.
+        """
+        metrics = dict(self.metrics)
+        metrics['queue_depth'] = self.entry_queue.qsize()
+        metrics['mean_submit_latency'] = metrics['total_submit_latency'] / max(metrics['submitted'], 1)
+        metrics['mean_write_latency'] = metrics['total_write_latency'] / max(metrics['written'], 1)
+        return metrics
 
 
 class MCOutputLog:
     """
-    Generates .csv logs containing measurements from the measurement processor. Updates (writes a line) once per
-    timestep.
+    Generates logs containing measurements from the measurement processor. Updates (writes a line) once per
+    timestep. The logs are either compressed columnar .npz files (see ColumnarMeasurementLogWriter) or .csv files,
+    per MCConfiguration.output_log_format.
 
     ATTRIBUTES:
         .csv_file: Contains the csv file object (see open_csv_file())
@@ -1553,14 +3483,34 @@ class MCOutputLog:
 
         .header_names: the plain english versions of the header names.
 
-        .csv_dict_writer: The dictionary writer object, used to write the .csv logs.
+        .csv_writer: The csv writer object, used to write the .csv logs. Rows are written in .header_mrids order.
+
+        .timestamp_formatter: The EpochTimestampFormatter used for 'utc' .csv timestamps.
+
+        .columnar_log_writer: The ColumnarMeasurementLogWriter for the current .npz log.
 
         .timestamp_array: A list of all timestamps for the logs. Appended at the end of simulation.
 
         .current_measurement: The dictionary containing the current set of measurements.
 
-        .is_first_measurement: Flags functions that should only run once at the start of logging (such as opening
-           the log files, setting up the header, etc.)
+        .current_sim_time: The simulation time of the current set of measurements, in integer epoch seconds.
+
+        .background_writer: The BackgroundLogWriter, when logs are written on a writer thread (see
+           MCConfiguration.output_log_background_writer).
+
+        .is_first_measurement: Flags functions that should only run once at the start of each log segment (such as
+           opening the log files, writing the header, etc.)
+
+        .log_measurement_mrids: The mRIDs of the measurements logged, computed once from the first measurement and
+           reused for every log segment (as are .header_mrids and the columnar measurement dictionary).
+
+        .segment: Details of the current log segment: its file, first and last simulation times, rows, and the
+           wall-clock time it was opened. Used for log rotation (see message_size_checkpoint()) and the manifest.
+
+        .manifest_segments: The manifest entries of the closed log segments, written to the manifest file
+           (MCConfiguration.output_log_name + '_manifest.json') whenever one changes. See find_log_segment().
+
+        .compression_pool: The worker threads compressing closed log segments.
 
     Update:
         - The objectives of this class is the same as the old version. However, its functionality is different as mentioned below:
@@ -1574,6 +3524,12 @@ class MCOutputLog:
             - After several trials-and-errors, it was noted that exporting a log file after 100 timesteps is sufficient. (Depends on Computer features and OS)
             - message_size_checkpoint() is a function that monitors the simulation time steps, closing old files, opening new files,
             and updating needed class parameters.
+            - Timestamps are kept as integer epoch seconds; .csv logs write them as is or format them with
+            EpochTimestampFormatter (MCConfiguration.output_log_csv_timestamp_format). The shared measurement
+            dictionary is no longer modified or copied; rows are written straight from it.
+            - Log segments now rotate by size and/or wall-clock interval (see MCConfiguration) instead of every 20
+            timesteps. Closed segments are compressed in the background and listed, with their simulation time
+            ranges, in a manifest file.
     """
 
     # @profile
@@ -1583,11 +3539,21 @@ class MCOutputLog:
         self.mrid_name_lookup_table = []
         self.header_mrids = []
         self.header_names = []
-        self.csv_dict_writer = None
+        self.csv_writer = None
+        self.timestamp_formatter = EpochTimestampFormatter()
+        self.columnar_log_writer = None
         self.current_measurement = None
+        self.current_sim_time = None
+        self.background_writer = None
         self.is_first_measurement = True
         self.message_size = 0
         self.file_num = 0
+        self.log_measurement_mrids = None
+        self.columnar_measurement_dictionary = None
+        self.segment = None
+        self.manifest_segments = []
+        self.manifest_lock = threading.Lock()
+        self.compression_pool = None
 
     # @profile
     def update_logs(self):
@@ -1600,40 +3566,84 @@ class MCOutputLog:
 
         UPDATE:
             - timestamp array is eliminated. Removed from the above paragraph!
+            - The measurements are handed to the writer thread when MCConfiguration.output_log_background_writer is
+              set, and written by write_log_entry() there. Otherwise, write_log_entry() is called directly.
+        """
+        current_measurement = edmMeasurementProcessor.get_current_measurements()
+        if current_measurement:
+            log_entry = (int(edmTimekeeper.sim_current_time), current_measurement)
+            if mcConfiguration.output_log_background_writer is True:
+                if self.background_writer is None:
+                    self.start_background_writer()
+                self.background_writer.submit(log_entry)
+            else:
+                self.write_log_entry(log_entry)
+
+    # @profile
+    def start_background_writer(self):
+        """
+        Starts the log writer thread, configured per MCConfiguration.
+        """
+        self.background_writer = BackgroundLogWriter(
+            write_function=self.write_log_entry,
+            flush_function=self.flush_log_file,
+            queue_size=mcConfiguration.output_log_queue_size,
+            queue_full_policy=mcConfiguration.output_log_queue_full_policy,
+            batch_size=mcConfiguration.output_log_batch_size,
+            fsync_interval=mcConfiguration.output_log_fsync_interval,
+            spill_file_path=f"{mcConfiguration.output_log_name}_spill.pkl")
+        self.background_writer.start()
+
+    # @profile
+    def write_log_entry(self, log_entry):
+        """
+        Writes one timestep's measurements, given as (simulation time, measurement dictionary). The measurement
+        dictionary is shared with the measurement processor, so it is only read.
         """
-        self.current_measurement = edmMeasurementProcessor.get_current_measurements()
+        self.current_sim_time, self.current_measurement = log_entry
         if self.current_measurement:
             print("Updating logs...")
             if self.is_first_measurement is True:
                 self.message_size = 0
                 print("First measurement routines...")
                 self.set_log_name()
-                self.open_csv_file()
-                self.mrid_name_lookup_table = edmCore.get_mrid_name_lookup_table()
-                self.translate_header_names()
-                self.open_csv_dict_writer()
-                self.write_header()
+                if self.log_measurement_mrids is None:
+                    self.log_measurement_mrids = [key for key in self.current_measurement.keys() if key != 'Timestamp']
+                if mcConfiguration.output_log_format == 'csv':
+                    self.open_csv_file()
+                    if not self.header_mrids:
+                        self.mrid_name_lookup_table = edmCore.get_mrid_name_lookup_table()
+                        self.translate_header_names()
+                    self.open_csv_writer()
+                    self.write_header()
+                else:
+                    self.open_columnar_log_writer()
+                self.segment = {'file': self.log_name, 'first_sim_time': self.current_sim_time,
+                                'opened_at': time.monotonic()}
                 self.is_first_measurement = False
-            self.append_timestamps()
             self.write_row()
+            self.segment['last_sim_time'] = self.current_sim_time
             self.message_size_checkpoint()
 
     # @profile
     def message_size_checkpoint (self):
         """
-        Set the message size and checks if the it is exceeded. If it is, it closes the current file, opens a new file, and
-        changes the is_first_measurement flag to True so we can head back to the update_logs function.
-
-        NOTE: The message_size must be hardcoded for long Simulations.
+        Counts the rows in the current log segment and checks if the segment should be rotated, I.E. it has reached
+        MCConfiguration.output_log_rotation_bytes or been open for MCConfiguration.output_log_rotation_interval
+        seconds. If so, it closes the current file and changes the is_first_measurement flag to True, so the next
+        measurement opens a new file.
         """
         self.message_size +=1
         # print('Current message size --->', self.message_size)
-        if self.message_size > 20:
-            print('Message size threshold reached!', self.message_size)
-            print(f"Opening file ---> {mcConfiguration.output_log_name}_{self.file_num}.csv")
+        rotation_bytes = mcConfiguration.output_log_rotation_bytes
+        rotation_interval = mcConfiguration.output_log_rotation_interval
+        if (rotation_bytes and self.get_segment_bytes() >= rotation_bytes) or \
+                (rotation_interval and time.monotonic() - self.segment['opened_at'] >= rotation_interval):
+            print('Log segment rotation threshold reached!', self.message_size)
+            print(f"Opening file ---> {mcConfiguration.output_log_name}_{self.file_num}.{mcConfiguration.output_log_format}")
             self.is_first_measurement = True
+            self.close_log_file()
             self.message_size = 0
-            self.close_out_logs()
 
     # @profile
     def open_csv_file(self):
@@ -1644,26 +3654,148 @@ class MCOutputLog:
         self.csv_file = open(self.log_name, 'w')
 
     # @profile
-    def open_csv_dict_writer(self):
+    def get_segment_bytes(self):
+        """
+        Returns the (uncompressed) size of the current log segment, in bytes.
+        """
+        if self.columnar_log_writer is not None:
+            return self.columnar_log_writer.get_buffered_bytes()
+        return self.csv_file.tell()
+
+    # @profile
+    def open_columnar_log_writer(self):
+        """
+        Opens the columnar log writer, logging the measurements in .log_measurement_mrids.
+        """
+        print("Opening .npz log:")
+        self.columnar_log_writer = ColumnarMeasurementLogWriter(
+            self.log_name, self.log_measurement_mrids, edmCore.get_measurement_enrichment_index(),
+            self.columnar_measurement_dictionary)
+        self.columnar_measurement_dictionary = self.columnar_log_writer.measurement_dictionary
+
+    # @profile
+    def open_csv_writer(self):
         """
-        Opens the dict writer used to write rows. Note that the headers used are the measurement mRIDs; the plain
-        English names are a visual effect only.
+        Opens the csv writer used to write rows. Note that the rows are ordered by the measurement mRIDs in
+        header_mrids; the plain English names are a visual effect only.
         """
-        self.csv_dict_writer = csv.DictWriter(self.csv_file, self.header_mrids) # header_mrids is a dict of object mrid and its name
+        self.csv_writer = csv.writer(self.csv_file)
 
     # @profile
     def close_out_logs(self):
         """
-        Closes the log file and re-appends the timestamps.
+        Called at the end of the simulation. Waits for the writer thread to finish writing (reporting its metrics),
+        then closes the log file.
         """
-        self.csv_file.close()
+        if self.background_writer is not None:
+            self.background_writer.stop()
+            print(f"Log writer metrics: {self.background_writer.get_metrics()}")
+            self.background_writer = None
+        self.close_log_file()
+        if self.compression_pool is not None:
+            self.compression_pool.shutdown(wait=True)
+            self.compression_pool = None
+
+    # @profile
+    def flush_log_file(self, fsync):
+        """
+        Flushes the .csv log file, forcing it to disk if fsync is True. (Columnar logs are written when closed.)
+        """
+        if self.csv_file is not None:
+            self.csv_file.flush()
+            if fsync is True:
+                os.fsync(self.csv_file.fileno())
+
+    # @profile
+    def close_log_file(self):
+        """
+        Closes the log file, adds the closed segment to the manifest, and (for .csv segments) queues it for
+        compression.
+        """
+        if self.segment is not None:
+            self.segment['bytes'] = self.get_segment_bytes()
+        if self.columnar_log_writer is not None:
+            self.columnar_log_writer.close()
+            self.columnar_log_writer = None
+        if self.csv_file is not None:
+            self.csv_file.close()
+            self.csv_file = None
+        if self.segment is not None:
+            self.add_segment_to_manifest()
+            self.segment = None
+
+    # @profile
+    def add_segment_to_manifest(self):
+        """
+        Adds the closed log segment to the manifest, then queues .csv segments for compression.
+        """
+        manifest_entry = {
+            'file': os.path.basename(self.segment['file']),
+            'format': mcConfiguration.output_log_format,
+            'compression': None,
+            'first_sim_time': self.segment['first_sim_time'],
+            'last_sim_time': self.segment['last_sim_time'],
+            'rows': self.message_size,
+            'bytes': self.segment['bytes']
+        }
+        with self.manifest_lock:
+            self.manifest_segments.append(manifest_entry)
+            self.write_manifest()
+        if mcConfiguration.output_log_format == 'csv' and mcConfiguration.output_log_compression == 'gzip':
+            if self.compression_pool is None:
+                self.compression_pool = ThreadPoolExecutor(
+                    max_workers=mcConfiguration.output_log_compression_workers, thread_name_prefix='MCOutputLogGzip')
+            self.compression_pool.submit(self.compress_log_segment, self.segment['file'], manifest_entry)
+
+    # @profile
+    def compress_log_segment(self, segment_file, manifest_entry):
+        """
+        Runs on a compression worker. Gzips a closed log segment (via a temporary file, so the manifest only ever
+        lists complete files), removes the original, and updates its manifest entry.
+        """
+        try:
+            temporary_file = segment_file + '.gz.tmp'
+            with open(segment_file, 'rb') as source, gzip.open(temporary_file, 'wb', compresslevel=6) as destination:
+                shutil.copyfileobj(source, destination, 2 ** 20)
+            os.replace(temporary_file, segment_file + '.gz')
+            with self.manifest_lock:
+                manifest_entry['file'] += '.gz'
+                manifest_entry['compression'] = 'gzip'
+                self.write_manifest()
+            os.remove(segment_file)
+        except OSError as e:
+            print(f"Could not compress log segment {segment_file}: {e!r}")
+
+    # @profile
+    def write_manifest(self):
+        """
+        Writes the manifest file, listing the closed log segments in simulation time order. Must be called with
+        manifest_lock held.
+        """
+        manifest_file = f"{mcConfiguration.output_log_name}_manifest.json"
+        with open(manifest_file + '.tmp', 'w') as temporary_file:
+            json.dump({'segments': self.manifest_segments}, temporary_file, indent=1)
+        os.replace(manifest_file + '.tmp', manifest_file)
+
+    @staticmethod
+    def find_log_segment(manifest_file, sim_time):
+        """
+        Returns the manifest entry of the log segment covering sim_time (or None), so a log reader can open that
+        segment directly. Segment file names are relative to the manifest file's folder.
+        """
+        with open(manifest_file) as file:
+            segments = json.load(file)['segments']
+        position = bisect.bisect_right([segment['first_sim_time'] for segment in segments], sim_time) - 1
+        if position >= 0 and sim_time <= segments[position]['last_sim_time']:
+            return segments[position]
+        return None
 
     # @profile
     def translate_header_names(self):
         """
         Looks up the plain english names for the headers and provides them to a dictionary for use by write_header().
         """
-        self.header_mrids = self.current_measurement.keys()
+        self.header_mrids = self.log_measurement_mrids
         mrid_name_lookup_dict = {}
 
         for item in self.mrid_name_lookup_table:
@@ -1684,31 +3816,33 @@ class MCOutputLog:
         self.header_mrids['Timestamp'] = 'Timestamp'
 
     # @profile
-    def append_timestamps(self):
+    def get_csv_timestamp(self):
         """
-        Convert simulation time to a human-readable format.
+        Returns the current simulation time as written to the .csv logs (see
+        MCConfiguration.output_log_csv_timestamp_format).
         """
-        self.current_measurement['Timestamp'] = pd.to_datetime(edmTimekeeper.sim_current_time, unit='s')
-        self.current_measurement['Timestamp'] = self.current_measurement['Timestamp'].tz_localize('UTC')
-        self.current_measurement['Timestamp'] = self.current_measurement['Timestamp'].strftime('%Y-%m-%d %H:%M:%S')
-
-        # print("CURRENT TIMESTAMP [TEST]:")
-        # print(self.current_measurement['Timestamp'])
-        # print(edmTimekeeper.sim_current_time)
+        if mcConfiguration.output_log_csv_timestamp_format == 'utc':
+            return self.timestamp_formatter.format(self.current_sim_time)
+        return self.current_sim_time
 
     # @profile
     def write_header(self):
         """
         Writes the log header.
         """
-        self.csv_dict_writer.writerow(self.header_mrids)
+        self.csv_writer.writerow(self.header_mrids.values())
 
     # @profile
     def write_row(self):
         """
         Writes a row of measurements to the logs.
         """
-        self.csv_dict_writer.writerow(self.current_measurement)
+        if self.columnar_log_writer is not None:
+            self.columnar_log_writer.write_row(self.current_sim_time, self.current_measurement)
+        else:
+            row = [self.current_measurement.get(mrid, '') for mrid in self.log_measurement_mrids]
+            row.append(self.get_csv_timestamp())
+            self.csv_writer.writerow(row)
 
     # @profile
     def set_log_name(self):
@@ -1717,7 +3851,7 @@ class MCOutputLog:
         """
         # self.log_name = f"{mcConfiguration.output_log_name}_{self.file_num}.csv"
         self.log_name = mcConfiguration.output_log_name
-        self.log_name = f"{mcConfiguration.output_log_name}_{self.file_num}.csv"
+        self.log_name = f"{mcConfiguration.output_log_name}_{self.file_num}.{mcConfiguration.output_log_format}"
         self.file_num += 1
 
 
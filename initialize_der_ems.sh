@@ -3,6 +3,9 @@
 #cd derms_help_files
 #python3 map_dcms_ders.py
 
+# The model and its DER-EMs are about to change, so the ME's cached model metadata is out of date.
+rm -rf ModelMetadata_Cache
+
 cd DERScripts
 echo "\n\n------------ UPLOADING MODEL ------------\n\n"
 python3 upload_model.py
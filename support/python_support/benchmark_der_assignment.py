@@ -0,0 +1,70 @@
+"""
+Benchmarks DER-to-DER-EM assignment: the legacy get_mRID_for_der_on_bus() scan (a next() scan of the query results
+and a rebuild of the assignment table for every DER) against DERAssignmentHandler.assign_der_s_manifest() with the
+per-bus free lists, on a synthetic feeder with DERS_PER_BUS DER-EMs on each bus. The free lists are timed from the raw
+query bindings (see DERAssignmentHandler.ingest_der_em_query_response()).
+
+    python3 benchmark_der_assignment.py [number_of_ders ...]      (default: 960 10000)
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import ModelController as mc
+
+DERS_PER_BUS = 4
+
+
+def legacy_assign(der_assignment_table, der_s_manifest):
+    """
+    get_mRID_for_der_on_bus() before the per-bus free lists were introduced, for every DER in the manifest.
+    """
+    association_table = {}
+    for der_id, bus in der_s_manifest.items():
+        next_mrid_on_bus = next(item for item in der_assignment_table if item['Bus'] == str(bus))
+        der_mrid = next_mrid_on_bus['DER_mRID']
+        assignment_table = [i for i in der_assignment_table if not (i['DER_mRID'] == der_mrid)]
+        association_table[der_id] = der_mrid
+    return association_table
+
+
+def synthetic_query_response(number_of_ders):
+    bindings = [{'name': {'value': f'der_em_{i}'}, 'id': {'value': f'_der_em_{i}'},
+                 'bus': {'value': f'tlx_{i // DERS_PER_BUS}'}, 'ratedS': {'value': '5000'},
+                 'ratedU': {'value': '240'}, 'phases': {'value': 's1s2'}} for i in range(number_of_ders)]
+    return {'data': {'results': {'bindings': bindings}}}
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main(number_of_ders):
+    lookup_table = [{'Bus': f'tlx_{i // DERS_PER_BUS}', 'DER_name': f'der_em_{i}', 'DER_mRID': f'_der_em_{i}'}
+                    for i in range(number_of_ders)]
+    der_s_manifest = {f'ders_{i}': f'tlx_{i // DERS_PER_BUS}' for i in range(number_of_ders)}
+
+    query_response = synthetic_query_response(number_of_ders)
+
+    handler = mc.DERAssignmentHandler()
+    legacy_time, legacy_table = timed(lambda: legacy_assign(lookup_table, der_s_manifest))
+    ingest_time, _ = timed(lambda: handler.ingest_der_em_query_response(query_response))
+    index_time, _ = timed(handler.build_free_der_em_index)
+    free_list_time, (association_table, oversubscribed_buses) = timed(
+        lambda: handler.assign_der_s_manifest(der_s_manifest))
+    assert not oversubscribed_buses and len(set(association_table.values())) == number_of_ders
+
+    print(f"{number_of_ders} DERs, {DERS_PER_BUS} per bus")
+    print(f"  Legacy scan:\t\t{legacy_time * 1000:.1f} ms\t"
+          f"({len(set(legacy_table.values()))} distinct DER-EMs assigned)")
+    print(f"  Query ingestion:\t{ingest_time * 1000:.2f} ms")
+    print(f"  Free lists:\t\t{(index_time + free_list_time) * 1000:.2f} ms\t"
+          f"({len(set(association_table.values()))} distinct DER-EMs assigned)")
+
+
+if __name__ == '__main__':
+    for number_of_ders in [int(arg) for arg in sys.argv[1:]] or [960, 10000]:
+        main(number_of_ders)
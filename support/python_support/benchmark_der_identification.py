@@ -0,0 +1,72 @@
+"""
+Benchmarks the DERIdentificationManager lookups for one timestep: get_der_em_mrid() for every DER input (DER-EM
+dispatch) and get_meas_name() for every DER-EM (measurement enrichment), with the legacy list scans against the lookup
+dictionaries built by initialize_association_lookup_table().
+
+    python3 benchmark_der_identification.py [number_of_ders ...]      (default: 960 10000)
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import ModelController as mc
+
+
+def legacy_get_meas_name(association_lookup_table, mrid):
+    """
+    get_meas_name() before the lookup dictionaries were introduced.
+    """
+    for i in association_lookup_table:
+        for key, value in i.items():
+            if value == mrid:
+                input_unique_id = key
+    try:
+        return input_unique_id
+    except UnboundLocalError:
+        return 'Unassigned'
+
+
+def legacy_get_der_em_mrid(association_lookup_table, name):
+    """
+    get_der_em_mrid() before the lookup dictionaries were introduced.
+    """
+    x = next(d for i, d in enumerate(association_lookup_table) if name in d)
+    return x[name]
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main(number_of_ders):
+    association_table = [{f'ders_{i}_Watts': f'_der_em_{i}'} for i in range(number_of_ders)]
+    input_ids = [f'ders_{i}_Watts' for i in range(number_of_ders)]
+    der_em_mrids = [f'_der_em_{i}' for i in range(number_of_ders)]
+
+    mc.derAssignmentHandler = mc.DERAssignmentHandler()
+    mc.derAssignmentHandler.association_table = association_table
+    manager = mc.DERIdentificationManager()
+    build_time, _ = timed(manager.initialize_association_lookup_table)
+
+    legacy_dispatch, legacy_mrids = timed(
+        lambda: [legacy_get_der_em_mrid(association_table, name) for name in input_ids])
+    indexed_dispatch, indexed_mrids = timed(lambda: [manager.get_der_em_mrid(name) for name in input_ids])
+    legacy_names_time, legacy_names = timed(
+        lambda: [legacy_get_meas_name(association_table, mrid) for mrid in der_em_mrids])
+    indexed_names_time, indexed_names = timed(lambda: [manager.get_meas_name(mrid) for mrid in der_em_mrids])
+    assert legacy_mrids == indexed_mrids and legacy_names == indexed_names
+
+    print(f"{number_of_ders} DERs")
+    print(f"  Lookup dictionary build (once):\t{build_time * 1000:.2f} ms")
+    print(f"  get_der_em_mrid, all DERs:\t\tlegacy {legacy_dispatch * 1000:.1f} ms\t"
+          f"indexed {indexed_dispatch * 1000:.2f} ms")
+    print(f"  get_meas_name, all DER-EMs:\t\tlegacy {legacy_names_time * 1000:.1f} ms\t"
+          f"indexed {indexed_names_time * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    for number_of_ders in [int(arg) for arg in sys.argv[1:]] or [960, 10000]:
+        main(number_of_ders)
@@ -0,0 +1,63 @@
+"""
+Benchmarks GOAggregationEngine (GOSensor automatic mode) on the PSU feeder topology, with a synthetic measurement frame:
+two PNV and four VA measurements on each topology bus, padded with measurements elsewhere on the feeder to the
+requested size.
+
+    python3 benchmark_go_aggregation.py [number_of_measurements]
+"""
+import os
+import sys
+import time
+import random
+
+ME_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ME_DIRECTORY)
+import ModelController as mc
+
+NUMBER_OF_FRAMES = 50
+
+
+def create_synthetic_frame(buses, number_of_measurements):
+    enrichment_index = {}
+    frame = {}
+    for i in range(number_of_measurements):
+        mrid = f'_meas_{i}'
+        if i < 6 * len(buses):
+            bus = buses[i // 6]
+            meas_type = 'PNV' if i % 6 < 2 else 'VA'
+        else:
+            bus = f'n{i}'
+            meas_type = 'A'
+        enrichment_index[mrid] = {'Bus': bus, 'MeasType': meas_type}
+        if meas_type == 'PNV':
+            frame[mrid] = {'magnitude': random.gauss(120, 2), 'angle': 0.0}
+        else:
+            frame[mrid] = {'magnitude': random.uniform(0, 6000), 'angle': random.uniform(-30, 30)}
+    return enrichment_index, frame
+
+
+def main(number_of_measurements):
+    topology_processor = mc.GOTopologyProcessor()
+    topology_processor.topology_file = os.path.join(ME_DIRECTORY, 'Configuration', 'psu_feeder_topology.xml')
+    topology_processor.import_topology_from_file()
+    enrichment_index, frame = create_synthetic_frame(topology_processor.get_buses(), number_of_measurements)
+
+    start = time.perf_counter()
+    engine = mc.GOAggregationEngine(topology_processor, enrichment_index)
+    setup_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(NUMBER_OF_FRAMES):
+        engine.update(frame, min_voltage=118.8, max_voltage=121.2, xfmr_rated_power=40000)
+    frame_time = (time.perf_counter() - start) / NUMBER_OF_FRAMES
+
+    print(f"{number_of_measurements} measurements ({len(engine.pnv_mrids)} PNV, {len(engine.va_mrids)} VA on "
+          f"{len(engine.level_names['bus'])} buses)")
+    print(f"Engine setup (once):\t{setup_time * 1000:.2f} ms")
+    print(f"Per frame:\t\t{frame_time * 1000:.2f} ms")
+    print(f"Buses outside band:\t{len(engine.get_buses_outside_voltage_band())}")
+    print(f"Overloaded xfmrs:\t{len(engine.get_overloaded_xfmrs())}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,90 @@
+"""
+Benchmarks the DERSHistoricalDataInput startup load: the legacy loader (read each profile, pd.concat inside the loop,
+to_dict) against the bulk loader, both without the consolidated cache (cold) and with it (warm).
+
+By default, a synthetic set of 960 profiles with 1440 one-minute rows each (the shape produced by
+create_ders_historical_data_input.py) is generated in a temporary folder. Pass an existing ME root folder (containing
+DERSHistoricalData_Inputs/) to benchmark real profiles instead:
+
+    python3 benchmark_historical_data_loading.py [me_root_folder]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import ModelController as mc
+
+NUMBER_OF_DERS = 960
+NUMBER_OF_ROWS = 1440
+START_TIME = 1672531200
+
+
+class me_folder:
+    def __init__(self, mc_file_directory):
+        self.mc_file_directory = mc_file_directory
+
+
+def create_synthetic_profiles(mc_file_directory):
+    input_folder = os.path.join(mc_file_directory, 'DERSHistoricalData_Inputs')
+    os.makedirs(input_folder)
+    time_column = np.arange(START_TIME, START_TIME + 60 * NUMBER_OF_ROWS, 60)
+    for i in range(NUMBER_OF_DERS):
+        pd.DataFrame({'Time': time_column,
+                      f'ders_{i}_Watts': np.random.randint(0, 4500, NUMBER_OF_ROWS),
+                      f'ders_{i}_VARs': np.zeros(NUMBER_OF_ROWS, dtype=int),
+                      f'ders_{i}_loc': f'tlx_652_a_h_{i}'}).to_csv(os.path.join(input_folder, f'ders_{i}.csv'),
+                                                                   index=False)
+
+
+def legacy_open_input_file(historical_data_file_path):
+    """
+    The loader used before the bulk loader was introduced.
+    """
+    ders = [file for file in os.listdir(historical_data_file_path)]
+    df_all = pd.read_csv(historical_data_file_path + ders[0], usecols=['Time'])
+    for file in ders:
+        df = pd.read_csv(historical_data_file_path + file)
+        df = df.drop('Time', axis=1)
+        df_all = pd.concat([df_all, df], axis=1)
+    df_all = df_all.fillna(0)
+    return df_all.to_dict(orient='records')
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main(mc_file_directory=None):
+    temporary_folder = None
+    if mc_file_directory is None:
+        temporary_folder = tempfile.mkdtemp()
+        mc_file_directory = temporary_folder
+        create_synthetic_profiles(mc_file_directory)
+
+    try:
+        ders = mc.DERSHistoricalDataInput(me_folder(mc_file_directory))
+        if os.path.exists(ders.historical_data_cache_file):
+            os.remove(ders.historical_data_cache_file)
+        legacy_time = timed(lambda: legacy_open_input_file(ders.historical_data_file_path))
+        cold_time = timed(ders.read_input_file)
+        warm_time = timed(ders.read_input_file)
+
+        print(f"{len(ders.list_of_ders)} DER inputs x {len(ders.input_times)} timesteps")
+        print(f"Legacy loader:\t\t\t{legacy_time:.2f} s")
+        print(f"Bulk loader (no cache):\t\t{cold_time:.2f} s")
+        print(f"Bulk loader (cached):\t\t{warm_time:.3f} s")
+        print(f"Value matrix size:\t\t{ders.input_values.nbytes / 2 ** 20:.1f} MiB")
+    finally:
+        if temporary_folder is not None:
+            shutil.rmtree(temporary_folder)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
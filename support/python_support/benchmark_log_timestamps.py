@@ -0,0 +1,78 @@
+"""
+Benchmarks the per-row timestamp cost of the .csv measurement logs: the legacy path (a pandas Timestamp built,
+tz-localized and strftime'd into a copy of the measurement dictionary, then written with a DictWriter) against integer
+epoch seconds and EpochTimestampFormatter, written with MCOutputLog's csv writer row.
+
+    python3 benchmark_log_timestamps.py [number_of_measurements] [number_of_rows]
+"""
+import io
+import os
+import sys
+import csv
+import time
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import ModelController as mc
+
+START_TIME = 1570041120
+
+
+def legacy_timestamp(sim_current_time):
+    """
+    The body of MCOutputLog.append_timestamps() before integer epoch timestamps were introduced.
+    """
+    timestamp = pd.to_datetime(int(sim_current_time), unit='s')
+    timestamp = timestamp.tz_localize('UTC')
+    return timestamp.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def time_per_row(function, number_of_rows):
+    start = time.perf_counter()
+    for i in range(number_of_rows):
+        function(START_TIME + i)
+    return (time.perf_counter() - start) / number_of_rows
+
+
+def main(number_of_measurements, number_of_rows):
+    measurements = {f'_meas_{i}': {'measurement_mrid': f'_meas_{i}', 'magnitude': 120.0, 'angle': 0.0}
+                    for i in range(number_of_measurements)}
+    mrids = list(measurements.keys())
+    header = dict(zip(mrids, mrids))
+    header['Timestamp'] = 'Timestamp'
+    formatter = mc.EpochTimestampFormatter()
+
+    for sim_time in (START_TIME, START_TIME + 86399, START_TIME + 86400 * 400 + 1):
+        assert formatter.format(sim_time) == legacy_timestamp(str(sim_time))
+
+    legacy_stamp = time_per_row(lambda t: legacy_timestamp(str(t)), number_of_rows)
+    formatter_stamp = time_per_row(formatter.format, number_of_rows)
+    epoch_stamp = time_per_row(lambda t: int(str(t)), number_of_rows)
+
+    legacy_writer = csv.DictWriter(io.StringIO(), header)
+
+    def legacy_row(sim_time):
+        row = dict(measurements)
+        row['Timestamp'] = legacy_timestamp(str(sim_time))
+        legacy_writer.writerow(row)
+
+    epoch_writer = csv.writer(io.StringIO())
+
+    def epoch_row(sim_time):
+        row = [measurements.get(mrid, '') for mrid in mrids]
+        row.append(sim_time)
+        epoch_writer.writerow(row)
+
+    legacy_row_time = time_per_row(legacy_row, number_of_rows)
+    epoch_row_time = time_per_row(epoch_row, number_of_rows)
+
+    print(f"{number_of_rows} rows of {number_of_measurements} measurements")
+    print(f"Timestamp only, legacy pandas:\t\t{legacy_stamp * 1e6:.2f} us/row")
+    print(f"Timestamp only, EpochTimestampFormatter:\t{formatter_stamp * 1e6:.2f} us/row")
+    print(f"Timestamp only, integer epoch:\t\t{epoch_stamp * 1e6:.2f} us/row")
+    print(f"Full .csv row, legacy:\t\t\t{legacy_row_time * 1000:.3f} ms/row")
+    print(f"Full .csv row, integer epoch:\t\t{epoch_row_time * 1000:.3f} ms/row")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000, int(sys.argv[2]) if len(sys.argv) > 2 else 2000)
@@ -0,0 +1,127 @@
+"""
+Benchmarks the measurement enrichment step of EDMMeasurementProcessor on a synthetic measurement message.
+
+The legacy path (rebuilding the lookup dictionaries and walking every mRID twice on each message) is reproduced below
+and compared with the enrichment index built once by EDMCore.build_measurement_enrichment_index().
+
+Run from anywhere:  python3 benchmark_measurement_enrichment.py [number_of_measurements]
+"""
+import os
+import sys
+import copy
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import ModelController as mc
+
+NUMBER_OF_DERS = 960
+NUMBER_OF_MESSAGES = 20
+
+
+def create_synthetic_model(number_of_measurements):
+    """
+    Builds lookup tables shaped like the GridAPPS-D responses, and a matching measurement message. The first
+    NUMBER_OF_DERS measurements are BatteryUnit measurements with an assigned DER-EM.
+    """
+    mrid_name_lookup_table = []
+    cim_measurement_dict = []
+    assignment_lookup_table = []
+    association_table = []
+    measurements = {}
+
+    for i in range(number_of_measurements):
+        measid = f'_meas_{i}'
+        if i < NUMBER_OF_DERS:
+            equipment_name = f'der_{i}'
+            mrid_name_lookup_table.append({'measid': measid, 'name': f'BatteryUnit_{equipment_name}_VA'})
+            assignment_lookup_table.append({'Bus': f'tlx_{i}', 'DER_name': equipment_name, 'DER_mRID': f'_der_{i}'})
+            association_table.append({f'ders_{i}_Watts': f'_der_{i}'})
+        else:
+            equipment_name = f'load_{i}'
+            mrid_name_lookup_table.append({'measid': measid, 'name': f'EnergyConsumer_{equipment_name}_PNV'})
+        cim_measurement_dict.append({'mRID': measid, 'ConductingEquipment_name': equipment_name,
+                                     'ConnectivityNode': f'tlx_{i}', 'phases': 's1', 'measurementType': 'VA'})
+        measurements[measid] = {'measurement_mrid': measid, 'magnitude': 120.0, 'angle': 0.0}
+
+    message = {'message': {'timestamp': 1672531200, 'measurements': measurements}}
+    return mrid_name_lookup_table, cim_measurement_dict, assignment_lookup_table, association_table, message
+
+
+def legacy_enrichment(current_measurements, measurement_names):
+    """
+    The per-message enrichment path used before the enrichment index was introduced.
+    """
+    mrid_name_lookup_dict = {}
+    for item in mc.edmCore.get_mrid_name_lookup_table():
+        mrid_name_lookup_dict[item['measid']] = item
+    mrid_measurement_lookup_dict = {}
+    for item in mc.edmCore.get_cim_measurement_dict():
+        mrid_measurement_lookup_dict[item['mRID']] = item
+
+    for i in current_measurements.keys():
+        measurement_names.append(mrid_name_lookup_dict[i]['name'])
+    measurement_mrids = dict(zip(list(current_measurements.keys()), measurement_names))
+    for key, value in measurement_mrids.items():
+        current_measurements[key]['Measurement name'] = value
+        measurement = mrid_measurement_lookup_dict[key]
+        current_measurements[key]['Conducting Equipment Name'] = measurement['ConductingEquipment_name']
+        current_measurements[key]['Bus'] = measurement['ConnectivityNode']
+        current_measurements[key]['Phases'] = measurement['phases']
+        current_measurements[key]['MeasType'] = measurement['measurementType']
+
+    assignment_lookup_dict = {}
+    for item in mc.derAssignmentHandler.get_assignment_lookup_table():
+        assignment_lookup_dict[item['DER_name']] = item
+    for key, value in current_measurements.items():
+        try:
+            assigned_der_em = assignment_lookup_dict[value['Conducting Equipment Name']]
+            if 'BatteryUnit' in value['Measurement name']:
+                value['Inverter Control mRID'] = assigned_der_em['DER_mRID']
+                value['DER Input Unique ID'] = mc.derIdentificationManager.get_meas_name(assigned_der_em['DER_mRID'])
+        except KeyError:
+            pass
+
+
+def time_per_message(function, messages):
+    start = time.perf_counter()
+    for message in messages:
+        function(message)
+    return (time.perf_counter() - start) / len(messages)
+
+
+def main(number_of_measurements):
+    name_table, cim_table, assignment_table, association_table, message = create_synthetic_model(
+        number_of_measurements)
+
+    mc.edmCore = mc.EDMCore()
+    mc.edmCore.mrid_name_lookup_table = name_table
+    mc.edmCore.cim_measurement_dict = cim_table
+    mc.derAssignmentHandler = mc.DERAssignmentHandler()
+    mc.derAssignmentHandler.assignment_lookup_table = assignment_table
+    mc.derIdentificationManager = mc.DERIdentificationManager()
+    mc.derIdentificationManager.association_lookup_table = association_table
+    mc.derIdentificationManager.build_lookup_dictionaries()
+
+    start = time.perf_counter()
+    mc.edmCore.build_measurement_enrichment_index()
+    index_build_time = time.perf_counter() - start
+    processor = mc.EDMMeasurementProcessor()
+
+    legacy_messages = [copy.deepcopy(message) for i in range(NUMBER_OF_MESSAGES)]
+    indexed_messages = [copy.deepcopy(message) for i in range(NUMBER_OF_MESSAGES)]
+    measurement_names = []
+    legacy_time = time_per_message(
+        lambda m: legacy_enrichment(m['message']['measurements'], measurement_names), legacy_messages)
+    indexed_time = time_per_message(processor.parse_message_into_current_measurements, indexed_messages)
+
+    assert legacy_messages[-1] == indexed_messages[-1], "Enriched measurements differ between the two paths."
+
+    print(f"{number_of_measurements} measurements, {NUMBER_OF_DERS} DER-EMs, {NUMBER_OF_MESSAGES} messages")
+    print(f"Index build (once):\t{index_build_time * 1000:.2f} ms")
+    print(f"Legacy path:\t\t{legacy_time * 1000:.2f} ms/message")
+    print(f"Enrichment index:\t{indexed_time * 1000:.2f} ms/message")
+    print(f"Speedup:\t\t{legacy_time / indexed_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
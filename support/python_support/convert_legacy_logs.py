@@ -0,0 +1,117 @@
+"""
+Converts .csv measurement logs (MeasOutputLogs_<run>_<N>.csv, one measurement dictionary repr per cell) into the
+columnar .npz log format written by MCOutputLog (see ColumnarMeasurementLogWriter), at a fraction of the disk cost.
+
+Each run becomes one folder in the archive folder, with one .npz partition per .csv segment and a manifest listing the
+partitions with their simulation time ranges, named as MCOutputLog names them, so the archive can be read by
+parse_logs.py (--log-name <run name>) or MCOutputLog.find_log_segment().
+
+Segments are converted in numeric segment order, in parallel over a process pool. The conversion is resumable: the
+manifest is rewritten as each partition completes (partitions are written to a temporary file and renamed), so
+rerunning the converter only converts the segments that are missing.
+
+    python3 convert_legacy_logs.py [log_folder] [archive_folder] [--workers N]
+"""
+import os
+import sys
+import json
+import argparse
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import ModelController as mc
+from parse_logs import DEFAULT_LOG_FOLDER, SEGMENT_PATTERN, read_csv_segment
+
+ENRICHMENT_FIELDS = tuple(mc.ColumnarMeasurementLogWriter.dictionary_fields.values())
+
+
+def find_legacy_runs(log_folder):
+    """
+    Returns {run name: [(segment number, segment path), ...]} for the .csv logs in log_folder, in segment order.
+    """
+    runs = {}
+    for filename in os.listdir(log_folder):
+        match = SEGMENT_PATTERN.match(filename)
+        if match and match.group(3) in ('csv', 'csv.gz'):
+            runs.setdefault(match.group(1), []).append((int(match.group(2)), os.path.join(log_folder, filename)))
+    return {run_name: sorted(segments) for run_name, segments in runs.items()}
+
+
+def convert_segment(arguments):
+    """
+    Runs in a worker process. Converts one .csv segment to an .npz partition and returns its manifest entry.
+    """
+    segment_file, partition_file = arguments
+    log_writer = None
+    manifest_entry = {'file': os.path.basename(partition_file), 'format': 'npz', 'compression': None,
+                      'first_sim_time': None, 'last_sim_time': None, 'rows': 0, 'bytes': 0,
+                      'source': os.path.basename(segment_file)}
+    for timestamp, measurements in read_csv_segment(segment_file):
+        measurements = {measurement.get('measurement_mrid') or measurement.get('Measurement name'): measurement
+                        for measurement in measurements}
+        if log_writer is None:
+            enrichment_index = {mrid: {field: measurement[field] for field in ENRICHMENT_FIELDS if field in measurement}
+                                for mrid, measurement in measurements.items()}
+            log_writer = mc.ColumnarMeasurementLogWriter(partition_file, measurements.keys(), enrichment_index)
+            manifest_entry['first_sim_time'] = timestamp
+        log_writer.write_row(timestamp, measurements)
+        manifest_entry['last_sim_time'] = timestamp
+        manifest_entry['rows'] += 1
+    if log_writer is None:
+        return None
+    manifest_entry['bytes'] = log_writer.get_buffered_bytes()
+    log_writer.close()
+    return manifest_entry
+
+
+def write_manifest(manifest_file, manifest_segments):
+    manifest_segments = sorted(manifest_segments, key=lambda segment: segment['first_sim_time'])
+    with open(manifest_file + '.tmp', 'w') as file:
+        json.dump({'segments': manifest_segments}, file, indent=1)
+    os.replace(manifest_file + '.tmp', manifest_file)
+
+
+def convert_run(pool, run_name, segments, archive_folder):
+    run_folder = os.path.join(archive_folder, run_name)
+    os.makedirs(run_folder, exist_ok=True)
+    manifest_file = os.path.join(run_folder, f'{run_name}_manifest.json')
+    manifest_segments = []
+    if os.path.exists(manifest_file):
+        with open(manifest_file) as file:
+            manifest_segments = [segment for segment in json.load(file)['segments']
+                                 if os.path.exists(os.path.join(run_folder, segment['file']))]
+    converted = {segment['source'] for segment in manifest_segments}
+
+    work = [(segment_file, os.path.join(run_folder, f'{run_name}_{segment_number}.npz'))
+            for segment_number, segment_file in segments if os.path.basename(segment_file) not in converted]
+    print(f"{run_name}: {len(segments)} segments, {len(segments) - len(work)} already converted")
+    for manifest_entry in pool.imap_unordered(convert_segment, work):
+        if manifest_entry is not None:
+            manifest_segments.append(manifest_entry)
+            write_manifest(manifest_file, manifest_segments)
+            print(f"  {manifest_entry['source']} -> {manifest_entry['file']} ({manifest_entry['rows']} rows)")
+    write_manifest(manifest_file, manifest_segments)
+
+    source_bytes = sum(os.path.getsize(segment_file) for segment_number, segment_file in segments)
+    archive_bytes = sum(os.path.getsize(os.path.join(run_folder, segment['file'])) for segment in manifest_segments)
+    print(f"{run_name}: {source_bytes / 2 ** 20:.2f} MiB of .csv logs -> {archive_bytes / 2 ** 20:.2f} MiB archive")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('log_folder', nargs='?', default=DEFAULT_LOG_FOLDER)
+    parser.add_argument('archive_folder', nargs='?', default='Logged Grid State Archive')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    arguments = parser.parse_args()
+
+    runs = find_legacy_runs(arguments.log_folder)
+    if not runs:
+        print(f"No .csv logs found in {arguments.log_folder}")
+        return
+    with Pool(arguments.workers) as pool:
+        for run_name, segments in sorted(runs.items()):
+            convert_run(pool, run_name, segments, arguments.archive_folder)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,60 +1,232 @@
+"""
+Analyzes the measurement logs written by MCOutputLog: per-bus voltage time series, VA totals, and voltage violation
+counts for a whole run.
+
+Log segments (.csv, gzipped .csv.gz, or columnar .npz) are analyzed in parallel over a process pool, and each .csv
+segment is streamed one row (timestep) at a time, so memory use depends on the segment size, not on the number of
+segments in the run. Results are written as each segment finishes, in simulation time order:
+
+    bus_voltages.csv    timestamp, bus, min/mean/max PNV magnitude on the bus
+    va_totals.csv       timestamp, total real power P, reactive power Q, and apparent power S of the VA measurements
+    violations.csv      bus, number of PNV measurements below/above the voltage band over the run
+
+Timestamps are integer epoch seconds. Usage:
+
+    python3 parse_logs.py [log_folder] [--output-folder DIR] [--log-name MeasOutputLogs_] [--workers N]
+                          [--min-voltage 114] [--max-voltage 126]
+"""
 import os
+import re
+import csv
 import ast
+import sys
+import glob
+import gzip
+import json
+import math
+import argparse
+import numpy as np
 import pandas as pd
-from pprint import pprint as pp
-import xml.etree.ElementTree as et
-
-class filter_measurements ():
-
-    def __init__(self):
-        self.path = "../Logged_Grid_State_Data/"
-    
-    def read_files (self, file):
-        """
-        If file does not start with 'Meas', then this function will return None
-        """
-        if file.startswith('Meas'):
-            df = pd.read_csv(self.path+file)
-            return df
-    
-    def drop_timestamp(self, df):
-        """
-        Replace the following return statement with a 'pass' statement if you need the timestamp column
-        """
-        return df.drop('Timestamp', axis=1)
-    
-    def parse_files (self, row):
-        """
-        Makes rows in each file looks like a dictionary. It's AWESOME!
-        """
-        return ast.literal_eval(row)
-
-    def get_VAs(self, parsed_file, meas_type):
-        """
-        You can filter the measurements anyway you want. I find it more useful to filter them based on their type.
-        In this function, Apparent power measurements are returned.
-        """
-        if parsed_file['MeasType'] == meas_type:
-            pass # Do what you want
-            
-    def get_PNVs (self, parsed_file, meas_type):
-        """
-        In this function, phase voltage measurements are returned.
-        """
-        if parsed_file['MeasType'] == meas_type:
-            pass # Do what you want
-    
-    def main_loop(self):
-        for files in os.listdir(self.path): # loop through directory and get files
-            df = self.read_files(files)
-            if df is not None:
-                df = self.drop_timestamp(df)
-                for col in df.columns:
-                    for index, row in df[col].items():
-                        parsed_rows = self.parse_files(row)
-                        self.get_VAs(parsed_file=parsed_rows, meas_type='VA')
-                        self.get_PNVs(parsed_file=parsed_rows, meas_type='PNV')
-                        
-
-parsing = filter_measurements()
-parsing.main_loop()
\ No newline at end of file
+from datetime import datetime, timezone
+from multiprocessing import Pool
+
+DEFAULT_LOG_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Logged Grid State Data')
+SEGMENT_PATTERN = re.compile(r'^(.*)_(\d+)\.(csv|csv\.gz|npz)$')
+
+# One "'key': value" pair of a measurement dictionary cell. Values are quoted strings or bare literals (numbers,
+# nan, None).
+MEASUREMENT_FIELD_PATTERN = re.compile(r"'([^']*)': (?:'([^']*)'|\"([^\"]*)\"|([^,}]+))")
+BARE_LITERALS = {'None': None, 'True': True, 'False': False, 'nan': math.nan}
+
+csv.field_size_limit(sys.maxsize)
+
+
+def parse_measurement_cell(cell):
+    """
+    Parses one measurement dictionary cell of a .csv log (the repr of a flat dictionary), without ast.literal_eval.
+    Falls back to ast.literal_eval for anything the pattern doesn't fully cover.
+    """
+    measurement = {}
+    for key, single_quoted, double_quoted, bare in MEASUREMENT_FIELD_PATTERN.findall(cell):
+        if bare:
+            bare = bare.strip()
+            if bare in BARE_LITERALS:
+                measurement[key] = BARE_LITERALS[bare]
+                continue
+            try:
+                measurement[key] = float(bare)
+            except ValueError:
+                return ast.literal_eval(cell)
+        else:
+            measurement[key] = single_quoted or double_quoted
+    if not measurement and cell.strip() not in ('', '{}'):
+        return ast.literal_eval(cell)
+    return measurement
+
+
+def parse_timestamp(timestamp):
+    """
+    Returns a log timestamp (integer epoch seconds, or a 'YYYY-MM-DD HH:MM:SS' UTC string) in epoch seconds.
+    """
+    if timestamp.isdigit():
+        return int(timestamp)
+    return int(datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc).timestamp())
+
+
+def find_log_segments(log_folder, log_name):
+    """
+    Returns the log segment paths in simulation time order: from the manifest files (see MCOutputLog) where present,
+    otherwise by run name and segment number.
+    """
+    segments = []
+    listed = set()
+    for manifest_file in sorted(glob.glob(os.path.join(log_folder, f'{log_name}*_manifest.json'))):
+        with open(manifest_file) as file:
+            for segment in json.load(file)['segments']:
+                path = os.path.join(log_folder, segment['file'])
+                segments.append(path)
+                listed.add(path)
+    unlisted = []
+    for filename in os.listdir(log_folder):
+        match = SEGMENT_PATTERN.match(filename)
+        path = os.path.join(log_folder, filename)
+        if match and filename.startswith(log_name) and path not in listed:
+            unlisted.append((match.group(1), int(match.group(2)), path))
+    return segments + [path for run_name, segment_number, path in sorted(unlisted)]
+
+
+def read_csv_segment(segment_file):
+    """
+    Yields (timestamp, measurements) for each row of a .csv or .csv.gz log segment, where measurements is a list of
+    measurement dictionaries.
+    """
+    opener = gzip.open if segment_file.endswith('.gz') else open
+    with opener(segment_file, 'rt', newline='') as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        timestamp_column = header.index('Timestamp')
+        for row in reader:
+            if not row:
+                continue
+            timestamp = parse_timestamp(row[timestamp_column])
+            yield timestamp, [parse_measurement_cell(cell) for column, cell in enumerate(row)
+                              if column != timestamp_column and cell]
+
+
+def analyze_csv_segment(segment_file, min_voltage, max_voltage):
+    bus_voltage_rows = []
+    va_rows = []
+    violations = {}
+    for timestamp, measurements in read_csv_segment(segment_file):
+        bus_voltages = {}
+        total_p = 0.0
+        total_q = 0.0
+        for measurement in measurements:
+            meas_type = measurement.get('MeasType')
+            magnitude = measurement.get('magnitude')
+            if magnitude is None or magnitude != magnitude:
+                continue
+            if meas_type == 'PNV':
+                bus = measurement.get('Bus', '')
+                bus_voltages.setdefault(bus, []).append(magnitude)
+                if magnitude < min_voltage or magnitude > max_voltage:
+                    counts = violations.setdefault(bus, [0, 0])
+                    counts[magnitude > max_voltage] += 1
+            elif meas_type == 'VA':
+                angle = math.radians(measurement.get('angle') or 0.0)
+                total_p += magnitude * math.cos(angle)
+                total_q += magnitude * math.sin(angle)
+        for bus, voltages in bus_voltages.items():
+            bus_voltage_rows.append((timestamp, bus, min(voltages), sum(voltages) / len(voltages), max(voltages)))
+        va_rows.append((timestamp, total_p, total_q, math.hypot(total_p, total_q)))
+    return bus_voltage_rows, va_rows, violations
+
+
+def analyze_npz_segment(segment_file, min_voltage, max_voltage):
+    with np.load(segment_file) as log:
+        measurement = log['measurement']
+        frame = pd.DataFrame({'timestamp': log['timestamp'], 'bus': log['bus'][measurement],
+                              'meas_type': log['meas_type'][measurement], 'magnitude': log['magnitude'],
+                              'angle': log['angle']})
+    frame = frame[frame['magnitude'].notna()]
+
+    pnv = frame[frame['meas_type'] == 'PNV']
+    bus_voltages = pnv.groupby(['timestamp', 'bus'], sort=True)['magnitude'].agg(['min', 'mean', 'max'])
+    bus_voltage_rows = [(int(timestamp), bus, low, mean, high)
+                        for (timestamp, bus), low, mean, high in bus_voltages.itertuples(name=None)]
+
+    va = frame[frame['meas_type'] == 'VA']
+    angle = np.radians(va['angle'].fillna(0.0).to_numpy(np.float64))
+    magnitude = va['magnitude'].to_numpy(np.float64)
+    totals = pd.DataFrame({'timestamp': va['timestamp'].to_numpy(), 'p': magnitude * np.cos(angle),
+                           'q': magnitude * np.sin(angle)}).groupby('timestamp', sort=True).sum()
+    totals = totals.reindex(np.unique(frame['timestamp'].to_numpy()), fill_value=0.0)
+    va_rows = [(int(timestamp), p, q, math.hypot(p, q)) for timestamp, p, q in totals.itertuples(name=None)]
+
+    violations = {}
+    for out_of_band, column in ((pnv[pnv['magnitude'] < min_voltage], 0), (pnv[pnv['magnitude'] > max_voltage], 1)):
+        for name, count in out_of_band['bus'].value_counts().items():
+            violations.setdefault(name, [0, 0])[column] += int(count)
+    return bus_voltage_rows, va_rows, violations
+
+
+def analyze_segment(arguments):
+    """
+    Runs in a worker process. Returns the segment's bus voltage rows, VA total rows and violation counts.
+    """
+    segment_file, min_voltage, max_voltage = arguments
+    if segment_file.endswith('.npz'):
+        return segment_file, analyze_npz_segment(segment_file, min_voltage, max_voltage)
+    return segment_file, analyze_csv_segment(segment_file, min_voltage, max_voltage)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('log_folder', nargs='?', default=DEFAULT_LOG_FOLDER)
+    parser.add_argument('--output-folder', default='log_analysis')
+    parser.add_argument('--log-name', default='MeasOutputLogs_', help='Only analyze logs starting with this name.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--min-voltage', type=float, default=114.0)
+    parser.add_argument('--max-voltage', type=float, default=126.0)
+    arguments = parser.parse_args()
+
+    segments = find_log_segments(arguments.log_folder, arguments.log_name)
+    if not segments:
+        print(f"No log segments found in {arguments.log_folder}")
+        return
+    os.makedirs(arguments.output_folder, exist_ok=True)
+    violations = {}
+    number_of_timesteps = 0
+
+    with open(os.path.join(arguments.output_folder, 'bus_voltages.csv'), 'w', newline='') as bus_voltage_file, \
+            open(os.path.join(arguments.output_folder, 'va_totals.csv'), 'w', newline='') as va_file, \
+            Pool(arguments.workers) as pool:
+        bus_voltage_writer = csv.writer(bus_voltage_file)
+        bus_voltage_writer.writerow(['timestamp', 'bus', 'min_voltage', 'mean_voltage', 'max_voltage'])
+        va_writer = csv.writer(va_file)
+        va_writer.writerow(['timestamp', 'total_p', 'total_q', 'total_s'])
+
+        work = ((segment, arguments.min_voltage, arguments.max_voltage) for segment in segments)
+        for segment, (bus_voltage_rows, va_rows, segment_violations) in pool.imap(analyze_segment, work):
+            bus_voltage_writer.writerows(bus_voltage_rows)
+            va_writer.writerows(va_rows)
+            number_of_timesteps += len(va_rows)
+            for bus, (under, over) in segment_violations.items():
+                counts = violations.setdefault(bus, [0, 0])
+                counts[0] += under
+                counts[1] += over
+            print(f"{os.path.basename(segment)}: {len(va_rows)} timesteps")
+
+    with open(os.path.join(arguments.output_folder, 'violations.csv'), 'w', newline='') as violations_file:
+        violations_writer = csv.writer(violations_file)
+        violations_writer.writerow(['bus', 'undervoltage_count', 'overvoltage_count'])
+        violations_writer.writerows((bus, under, over) for bus, (under, over) in sorted(violations.items()))
+
+    print(f"{len(segments)} segments, {number_of_timesteps} timesteps, {len(violations)} buses with voltage "
+          f"violations. Results in {arguments.output_folder}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Stress test for the RWHDERS input readers. Creates 5,000 synthetic RWHDERS input files, then for each simulated second
+appends a new power value to 1% of them and runs one RWHDERS time step in polling mode and one in file watcher
+(inotify) mode. Checks both modes report the same input requests, and prints the per-time-step cost of each.
+
+    python3 stress_test_rwhders_file_watcher.py [number_of_files] [number_of_seconds]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import ModelController as mc
+
+CHANGED_FRACTION = 0.01
+
+
+class me_configuration:
+    def __init__(self, mc_file_directory, rwhders_use_file_watcher):
+        self.mc_file_directory = mc_file_directory
+        self.rwhders_use_file_watcher = rwhders_use_file_watcher
+
+
+def create_input_files(input_folder, number_of_files):
+    filenames = []
+    for i in range(number_of_files):
+        filename = f"DER{i:05d}_Bus652_a_h_{i % 64}.csv"
+        with open(os.path.join(input_folder, filename), 'w') as der_file:
+            print("P,0", file=der_file)
+        filenames.append(filename)
+    return filenames
+
+
+def timed_update(rwhders):
+    start = time.perf_counter()
+    rwhders.update_der_em_input_request()
+    return time.perf_counter() - start
+
+
+def main(number_of_files, number_of_seconds):
+    mc_file_directory = tempfile.mkdtemp()
+    input_folder = os.path.join(mc_file_directory, 'RWHDERS Inputs')
+    os.makedirs(input_folder)
+    try:
+        filenames = create_input_files(input_folder, number_of_files)
+        polling = mc.RWHDERS(me_configuration(mc_file_directory, False))
+        watching = mc.RWHDERS(me_configuration(mc_file_directory, True))
+        polling.initialize_der_s()
+        watching.initialize_der_s()
+        if watching.file_watcher is None:
+            print("inotify unavailable on this system; nothing to compare.")
+            return
+
+        polling_first = timed_update(polling)
+        watching_first = timed_update(watching)
+        assert polling.der_em_input_request == watching.der_em_input_request
+
+        polling_times = []
+        watching_times = []
+        for second in range(number_of_seconds):
+            for filename in random.sample(filenames, int(number_of_files * CHANGED_FRACTION)):
+                with open(os.path.join(input_folder, filename), 'a') as der_file:
+                    print(f"P,{random.randint(0, 4500)}", file=der_file)
+            polling_times.append(timed_update(polling))
+            watching_times.append(timed_update(watching))
+            assert polling.der_em_input_request == watching.der_em_input_request, f"Mismatch at second {second}"
+        watching.file_watcher.close()
+
+        print(f"{number_of_files} files, {CHANGED_FRACTION:.0%} changed per second, {number_of_seconds} seconds")
+        print(f"First time step:\tpolling {polling_first * 1000:.1f} ms\twatcher {watching_first * 1000:.1f} ms")
+        print(f"Per time step:\t\tpolling {sum(polling_times) / number_of_seconds * 1000:.2f} ms"
+              f"\twatcher {sum(watching_times) / number_of_seconds * 1000:.2f} ms")
+    finally:
+        shutil.rmtree(mc_file_directory)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000, int(sys.argv[2]) if len(sys.argv) > 2 else 30)
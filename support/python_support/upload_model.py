@@ -1,4 +1,5 @@
 import os
+import shutil
 import subprocess
 import cimhub.api as cimhub
 import xml.etree.ElementTree as et
@@ -28,6 +29,11 @@ class upload_feeder_blazegraph:
     def remove_all_feeders(self):
         cimhub.clear_db (self.cfg_json)
 
+    def clear_model_metadata_cache(self):
+        # The ME caches model metadata between runs (see ModelMetadataCache in ModelController.py).
+        shutil.rmtree(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'ModelMetadata_Cache'),
+                      ignore_errors=True)
+
     def upload_model_to_blazegraph(self):
         os.system(f'curl -D- -H "Content-Type: application/xml" --upload-file ../dss_files/{self.dss_name}.xml -X POST {CIMHubConfig.blazegraph_url}')
     
@@ -164,4 +170,5 @@ if __name__ == '__main__':
     feeder.get_blazegraph_link()
     feeder.remove_all_feeders()
     feeder.upload_model_to_blazegraph()
+    feeder.clear_model_metadata_cache()
     feeder.list_feeders()
\ No newline at end of file